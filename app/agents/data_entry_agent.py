@@ -1,377 +1,384 @@
 import os
 import sys
-import time
-import json
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+from typing import Dict, Any, List, Optional, AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
-import random
-
-# Add parent directory to path
-sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from concurrent.futures import ThreadPoolExecutor
 
 from app.database.models import Lead, LeadStatus
 from app.database.repository import LeadRepository
+from app.agents.leadhoop_ops import login, submit_lead, flush_screenshots
 from app.config.settings import (
-    LEADHOOP_PORTAL_URL,
     LEADHOOP_USERNAME,
     LEADHOOP_PASSWORD,
+    LEADHOOP_STATE_PATH,
     MAX_CONCURRENT_DATA_ENTRIES,
-    ENTRY_RETRY_ATTEMPTS,
-    ENTRY_TIMEOUT_SECONDS
+    SCREENSHOT_DIRECTORY,
+    BROWSER_CDP_ENDPOINT
 )
 from loguru import logger
 
 # Import Playwright
-from playwright.async_api import async_playwright, Playwright, Browser, Page, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+
+
+# Browser settings shared by every per-lead context
+BROWSER_VIEWPORT = {"width": 1920, "height": 1080}
+BROWSER_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+# Resource types the form never needs; stylesheets are kept because
+# visibility waits depend on CSS
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
 
+# Where Chromium lives inside the Playwright browsers directory, per platform
+CHROMIUM_EXECUTABLE_PATTERNS = (
+    "chromium-*/chrome-linux*/chrome",
+    "chromium-*/chrome-win*/chrome.exe",
+    "chromium-*/chrome-mac*/Chromium.app",
+)
 
-class LeadHoopClient:
+class BrowserPool:
     """
-    Client for interacting with the LeadHoop portal using Playwright.
+    Owns the Playwright driver and the single browser shared by all leads.
+    
+    Starting Playwright and launching Chromium are by far the most expensive
+    operations, so they happen once per agent run rather than once per lead.
     """
     
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, cdp_endpoint: Optional[str] = None):
         """
-        Initialize the LeadHoop client.
+        Initialize the browser pool.
         
         Parameters:
         -----------
         headless : bool, optional
             Whether to run the browser in headless mode. Default is True.
+        cdp_endpoint : str, optional
+            CDP endpoint of a shared, already running Chromium. When set, the
+            pool connects to it instead of launching its own browser.
         """
         self.headless = headless
+        self.cdp_endpoint = cdp_endpoint
         self.playwright = None
         self.browser = None
-        self.context = None
     
-    async def __aenter__(self):
+    async def start(self) -> Browser:
         """
-        Context manager entry - initialize Playwright and browser.
+        Start Playwright and launch the browser if not already running.
+        
+        Returns:
+        --------
+        Browser
+            The shared browser instance.
         """
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(headless=self.headless)
-        self.context = await self.browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
-        return self
+        if self.browser is None:
+            self.playwright = await async_playwright().start()
+            if self.cdp_endpoint:
+                logger.info(f"Connecting to shared browser at {self.cdp_endpoint}")
+                self.browser = await self.playwright.chromium.connect_over_cdp(self.cdp_endpoint)
+            else:
+                self.browser = await self.playwright.chromium.launch(headless=self.headless)
+        return self.browser
     
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
+    async def close(self) -> None:
         """
-        Context manager exit - close browser and Playwright.
+        Close the browser and stop Playwright.
+        
+        For a shared CDP browser this only disconnects and closes the
+        contexts this agent created.
         """
-        if self.context:
-            await self.context.close()
         if self.browser:
             await self.browser.close()
+            self.browser = None
         if self.playwright:
             await self.playwright.stop()
+            self.playwright = None
+
+
+async def _repo(fn, *args, **kwargs):
+    """
+    Run a blocking repository call on the default thread pool.
+    
+    Keeps database I/O from stalling the event loop that drives the browser
+    contexts of all concurrent leads.
+    
+    Parameters:
+    -----------
+    fn : Callable
+        The repository function to call.
+    *args, **kwargs
+        Arguments passed through to the function.
+        
+    Returns:
+    --------
+    Any
+        The function's return value.
+    """
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+async def _block_heavy_resources(route) -> None:
+    """
+    Abort requests for resources that are not needed to submit a form.
+    
+    Parameters:
+    -----------
+    route : Route
+        Playwright route for the intercepted request.
+    """
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def _open_context(browser: Browser, storage_state: Optional[str] = None) -> BrowserContext:
+    """
+    Open a browser context configured for the LeadHoop portal.
     
-    async def login(self, page: Page) -> bool:
+    Parameters:
+    -----------
+    browser : Browser
+        The shared browser to open the context in.
+    storage_state : str, optional
+        Path to a saved storage state to restore the portal login from.
+        
+    Returns:
+    --------
+    BrowserContext
+        The new context, with heavy resources blocked.
+    """
+    context = await browser.new_context(
+        storage_state=storage_state,
+        viewport=BROWSER_VIEWPORT,
+        user_agent=BROWSER_USER_AGENT
+    )
+    await context.route("**/*", _block_heavy_resources)
+    return context
+
+
+# Resets the page origin's storage to the saved login's (sessionStorage dies
+# with the page, but localStorage outlives it in the pooled context). Pages on
+# about:blank or opaque origins have no storage to reset
+RESET_STORAGE_JS = """
+(origins) => {
+    try {
+        localStorage.clear();
+        sessionStorage.clear();
+        const saved = origins.find(o => o.origin === location.origin);
+        for (const {name, value} of (saved ? saved.localStorage : [])) {
+            localStorage.setItem(name, value);
+        }
+    } catch (e) {}
+}
+"""
+
+
+class ContextPool:
+    """
+    Bounded pool of warm browser contexts restored from the saved login.
+    
+    Contexts are recycled across leads instead of being created and closed
+    for each one, which keeps per-lead overhead to a single navigation and
+    memory flat over long runs. A context that fails (crashed or closed) or
+    belongs to an older login is replaced by a fresh one, so the pool never
+    shrinks.
+    """
+    
+    def __init__(self, size: int):
         """
-        Log in to the LeadHoop portal.
+        Initialize the context pool.
         
         Parameters:
         -----------
-        page : Page
-            Playwright page object.
-            
+        size : int
+            Number of contexts to keep warm.
+        """
+        self.size = size
+        self._queue = None
+        self._browser = None
+        self._storage_state = None
+        self._contexts = []
+        self._auth_cookies = []
+        self._auth_origins = []
+        self._generation = 0
+        self._context_generation = {}  # Login generation each context was opened with
+    
+    async def start(self, browser: Browser, storage_state: str) -> None:
+        """
+        Create the pooled contexts from the saved login state.
+        
+        Parameters:
+        -----------
+        browser : Browser
+            The shared browser to open the contexts in.
+        storage_state : str
+            Path to the saved storage state.
+        """
+        self._browser = browser
+        self._storage_state = storage_state
+        self._queue = asyncio.Queue()
+        for _ in range(self.size):
+            self._queue.put_nowait(await self._open())
+    
+    def update_auth_state(self, state: Dict[str, Any]) -> None:
+        """
+        Record a fresh login; contexts of older logins are replaced on checkout.
+        
+        Parameters:
+        -----------
+        state : Dict[str, Any]
+            The saved storage state ("cookies" and "origins").
+        """
+        self._auth_cookies = state["cookies"]
+        self._auth_origins = state.get("origins", [])
+        self._generation += 1
+    
+    async def _open(self) -> BrowserContext:
+        """
+        Open a pooled context from the saved login state.
+        
         Returns:
         --------
-        bool
-            True if login successful, False otherwise.
+        BrowserContext
+            The new context.
         """
-        try:
-            # Check if credentials are set
-            if not LEADHOOP_USERNAME or not LEADHOOP_PASSWORD:
-                logger.error("LeadHoop credentials are not set")
-                return False
-            
-            # Navigate to login page (this might need adjustment based on the actual portal)
-            await page.goto(LEADHOOP_PORTAL_URL, wait_until="networkidle")
-            
-            # Check if we're already logged in (this depends on the portal's behavior)
-            if "login" not in page.url.lower() and "sign in" not in await page.title().lower():
-                logger.info("Already logged in to LeadHoop")
-                return True
-            
-            # Find and fill login form
-            await page.fill("input[name='username'], input[name='email']", LEADHOOP_USERNAME)
-            await page.fill("input[name='password']", LEADHOOP_PASSWORD)
-            
-            # Click login button
-            await page.click("button[type='submit'], input[type='submit']")
-            
-            # Wait for navigation to complete
-            await page.wait_for_load_state("networkidle")
-            
-            # Verify login was successful
-            if "login" in page.url.lower() or "sign in" in await page.title().lower():
-                logger.error("Login failed - still on login page")
-                return False
-            
-            logger.info("Successfully logged in to LeadHoop")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error logging in to LeadHoop: {str(e)}")
-            return False
+        context = await _open_context(self._browser, self._storage_state)
+        self._contexts.append(context)
+        self._context_generation[context] = self._generation
+        return context
     
-    async def submit_lead(self, page: Page, lead: Lead) -> Dict[str, Any]:
+    async def _replace(self, context: BrowserContext) -> BrowserContext:
         """
-        Submit a lead to the LeadHoop portal.
+        Close a context and open a fresh one in its place.
+        
+        If the new context cannot be opened, the exception propagates and the
+        old context stays in the pool, to be replaced on its next checkout.
         
         Parameters:
         -----------
-        page : Page
-            Playwright page object.
-        lead : Lead
-            The lead to submit.
+        context : BrowserContext
+            The context to replace.
             
         Returns:
         --------
-        Dict[str, Any]
-            Result of the submission.
+        BrowserContext
+            The new context.
         """
         try:
-            # Navigate to the submission form
-            await page.goto(LEADHOOP_PORTAL_URL, wait_until="networkidle")
-            
-            # Wait for the form to be visible
-            form_selector = "form"  # Adjust based on the actual portal
-            await page.wait_for_selector(form_selector, state="visible")
-            
-            # Fill in the form fields based on lead data
-            await self._fill_lead_form(page, lead)
-            
-            # Take a screenshot for verification (optional)
-            screenshot_path = f"logs/screenshots/lead_{lead.id}_{datetime.now().strftime('%Y%m%d%H%M%S')}.png"
-            os.makedirs(os.path.dirname(screenshot_path), exist_ok=True)
-            await page.screenshot(path=screenshot_path)
-            
-            # Submit the form
-            await page.click("button[type='submit']")
-            
-            # Wait for submission to complete (adjust based on portal behavior)
-            await page.wait_for_load_state("networkidle")
-            
-            # Check for success indicators
-            success = await self._verify_submission_success(page)
-            
-            if success:
-                logger.info(f"Successfully submitted lead {lead.id} to LeadHoop")
-                return {
-                    "success": True,
-                    "lead_id": lead.id,
-                    "screenshot": screenshot_path,
-                    "message": "Lead submitted successfully"
-                }
-            else:
-                error_message = await self._extract_error_message(page)
-                logger.error(f"Failed to submit lead {lead.id}: {error_message}")
-                return {
-                    "success": False,
-                    "lead_id": lead.id,
-                    "screenshot": screenshot_path,
-                    "error": error_message
-                }
-                
-        except Exception as e:
-            logger.error(f"Error submitting lead {lead.id}: {str(e)}")
-            
-            # Try to take a screenshot of the error state
-            try:
-                error_screenshot = f"logs/screenshots/error_lead_{lead.id}_{datetime.now().strftime('%Y%m%d%H%M%S')}.png"
-                os.makedirs(os.path.dirname(error_screenshot), exist_ok=True)
-                await page.screenshot(path=error_screenshot)
-            except:
-                error_screenshot = None
-            
-            return {
-                "success": False,
-                "lead_id": lead.id,
-                "screenshot": error_screenshot,
-                "error": str(e)
-            }
+            await context.close()
+        except Exception:
+            pass  # Already closed or crashed
+        
+        new_context = await self._open()
+        self._contexts.remove(context)
+        self._context_generation.pop(context, None)
+        return new_context
     
-    async def _fill_lead_form(self, page: Page, lead: Lead) -> None:
+    async def _reset(self, page: Page) -> None:
         """
-        Fill in the LeadHoop form with lead data.
+        Drop everything but the current login from a page's context.
         
         Parameters:
         -----------
         page : Page
-            Playwright page object.
-        lead : Lead
-            The lead whose data to fill in.
-        """
-        # Map the lead fields to form field selectors
-        # This mapping will need to be adjusted based on the actual portal's form
-        form_mapping = {
-            # Basic information
-            "input[name='first_name']": lead.firstname,
-            "input[name='last_name']": lead.lastname,
-            "input[name='email']": lead.confirmed_email or lead.email,
-            "input[name='phone']": lead.confirmed_phone or lead.phone1,
-            
-            # Address
-            "input[name='address']": lead.confirmed_address or lead.address,
-            "input[name='address2']": lead.address2,
-            "input[name='city']": lead.city,
-            "input[name='state']": lead.state,
-            "input[name='zip']": lead.zip,
-            
-            # Additional fields
-            "input[name='education_level']": lead.education_level,
-            "select[name='area_of_study']": lead.confirmed_area_of_interest or lead.area_of_study,
-            "input[name='grad_year']": lead.grad_year,
-            "input[name='start_date']": lead.start_date,
-        }
+            The page the lead was entered on, still open.
+        """
+        await page.evaluate(RESET_STORAGE_JS, self._auth_origins)
+        await page.context.clear_cookies()
+        if self._auth_cookies:
+            await page.context.add_cookies(self._auth_cookies)
+    
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """
+        Check out a pooled context and open a page in it.
         
-        # Fill in the form fields
-        for selector, value in form_mapping.items():
-            if value:
+        Yields:
+        -------
+        Page
+            A page on a logged-in context. On exit the context's storage and
+            cookies are reset to the login's and the page is closed; a context
+            that fails along the way is replaced. The context (or its
+            replacement) always goes back to the pool.
+        """
+        context = await self._queue.get()
+        try:
+            if self._context_generation.get(context) != self._generation:
+                context = await self._replace(context)
+            try:
+                page = await context.new_page()
+            except Exception as e:
+                logger.warning(f"Replacing failed browser context: {str(e)}")
+                context = await self._replace(context)
+                page = await context.new_page()
+            
+            try:
+                yield page
+            finally:
                 try:
-                    if selector.startswith("select"):
-                        # Handle dropdown fields
-                        await page.select_option(selector, value)
-                    elif selector.startswith("input[type='checkbox']"):
-                        # Handle checkbox fields
-                        if value.lower() in ["yes", "true", "1"]:
-                            await page.check(selector)
-                    else:
-                        # Handle regular input fields
-                        await page.fill(selector, str(value))
+                    await self._reset(page)
+                    await page.close()
                 except Exception as e:
-                    logger.warning(f"Could not fill field {selector}: {str(e)}")
-        
-        # Handle checkbox for TCPA acceptance
-        if lead.tcpa_accepted:
+                    logger.warning(f"Replacing failed browser context: {str(e)}")
+                    try:
+                        context = await self._replace(context)
+                    except Exception as e:
+                        # Keep the slot; the next checkout retries the replacement
+                        logger.error(f"Could not open a replacement browser context: {str(e)}")
+        finally:
+            self._queue.put_nowait(context)
+    
+    async def close(self) -> None:
+        """
+        Close all pooled contexts.
+        """
+        for context in self._contexts:
             try:
-                # Look for common TCPA checkbox selectors
-                tcpa_selectors = [
-                    "input[name='tcpa_consent']",
-                    "input[name='tcpa_opt_in']",
-                    "input[id*='tcpa']",
-                    "input[id*='consent']",
-                    "input[type='checkbox']"
-                ]
-                
-                for selector in tcpa_selectors:
-                    if await page.query_selector(selector):
-                        await page.check(selector)
-                        break
+                await context.close()
             except Exception as e:
-                logger.warning(f"Could not check TCPA consent: {str(e)}")
+                logger.warning(f"Error closing browser context: {str(e)}")
+        self._contexts = []
+        self._context_generation = {}
+
+
+class LeadHoopSession:
+    """
+    Lightweight per-lead browser context and page on top of a shared browser.
+    """
     
-    async def _verify_submission_success(self, page: Page) -> bool:
+    def __init__(self, browser: Browser, storage_state: Optional[str] = None):
         """
-        Verify if the form submission was successful.
+        Initialize the session.
         
         Parameters:
         -----------
-        page : Page
-            Playwright page object.
-            
-        Returns:
-        --------
-        bool
-            True if submission was successful, False otherwise.
-        """
-        # Look for success indicators (adjust based on the portal)
-        success_indicators = [
-            "thank you",
-            "success",
-            "submitted",
-            "received",
-            "confirmation"
-        ]
-        
-        try:
-            # Check URL for success indicators
-            for indicator in success_indicators:
-                if indicator in page.url.lower():
-                    return True
-            
-            # Check page content for success messages
-            page_content = await page.content()
-            for indicator in success_indicators:
-                if indicator in page_content.lower():
-                    return True
-            
-            # Look for success elements
-            success_selectors = [
-                ".success-message",
-                ".alert-success",
-                ".confirmation",
-                "h1:has-text('Thank You')",
-                ".success"
-            ]
-            
-            for selector in success_selectors:
-                if await page.query_selector(selector):
-                    return True
-            
-            # If we couldn't find any success indicators, check for error indicators
-            error_indicators = [
-                "error",
-                "failed",
-                "invalid",
-                "problem",
-                "incorrect"
-            ]
-            
-            for indicator in error_indicators:
-                if indicator in page_content.lower():
-                    return False
-            
-            # If we couldn't determine success or failure, default to assuming it worked
-            # This might need adjustment based on the portal's behavior
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error verifying submission success: {str(e)}")
-            return False
+        browser : Browser
+            The shared browser to open the context in.
+        storage_state : str, optional
+            Path to a saved storage state to restore the portal login from.
+        """
+        self.browser = browser
+        self.storage_state = storage_state
+        self.context = None
+        self.page = None
     
-    async def _extract_error_message(self, page: Page) -> str:
+    async def __aenter__(self):
         """
-        Extract error message from the page after a failed submission.
-        
-        Parameters:
-        -----------
-        page : Page
-            Playwright page object.
-            
-        Returns:
-        --------
-        str
-            Extracted error message, or a generic message if none found.
+        Context manager entry - open a fresh browser context and page.
         """
-        try:
-            # Look for common error message selectors
-            error_selectors = [
-                ".error-message",
-                ".alert-danger",
-                ".form-error",
-                ".validation-summary-errors",
-                ".error"
-            ]
-            
-            for selector in error_selectors:
-                element = await page.query_selector(selector)
-                if element:
-                    message = await element.text_content()
-                    if message.strip():
-                        return message.strip()
-            
-            # If no specific error message found, return generic one
-            return "Form submission failed without a specific error message"
-            
-        except Exception as e:
-            logger.error(f"Error extracting error message: {str(e)}")
-            return "Error extracting error message from page"
+        self.context = await _open_context(self.browser, self.storage_state)
+        self.page = await self.context.new_page()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """
+        Context manager exit - close the browser context (and its page).
+        """
+        if self.context:
+            await self.context.close()
 
 
 class DataEntryAgent:
@@ -379,7 +386,7 @@ class DataEntryAgent:
     Agent for submitting leads to the LeadHoop portal.
     """
     
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, cdp_endpoint: Optional[str] = BROWSER_CDP_ENDPOINT):
         """
         Initialize the Data Entry Agent.
         
@@ -387,9 +394,67 @@ class DataEntryAgent:
         -----------
         headless : bool, optional
             Whether to run the browser in headless mode. Default is True.
+        cdp_endpoint : str, optional
+            CDP endpoint of a shared Chromium to connect to instead of
+            launching one. Defaults to the BROWSER_CDP_ENDPOINT setting.
         """
         self.headless = headless
-        self.active_entries = 0  # Tracks currently active data entry processes
+        self.active_leads = set()  # IDs of leads currently being entered
+        self.browser_pool = BrowserPool(headless=headless, cdp_endpoint=cdp_endpoint)
+        self.context_pool = ContextPool(MAX_CONCURRENT_DATA_ENTRIES)
+        os.makedirs(SCREENSHOT_DIRECTORY, exist_ok=True)
+        self.state_path = LEADHOOP_STATE_PATH
+        self._login_lock = asyncio.Lock()
+        self._login_generation = 0  # Bumped every time the saved session is refreshed
+    
+    async def _refresh_login(self, generation: Optional[int] = None) -> bool:
+        """
+        Log in on a throwaway context and save its storage state for reuse.
+        
+        Parameters:
+        -----------
+        generation : int, optional
+            Login generation the caller saw as expired. If another task has
+            already refreshed the session since then, the login is skipped.
+            
+        Returns:
+        --------
+        bool
+            True if a valid session is available, False otherwise.
+        """
+        async with self._login_lock:
+            if generation is not None and generation != self._login_generation:
+                return True
+            
+            browser = await self.browser_pool.start()
+            async with LeadHoopSession(browser) as session:
+                if not await login(session.page):
+                    return False
+                
+                os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+                state = await session.context.storage_state(path=self.state_path)
+            
+            self.context_pool.update_auth_state(state)
+            self._login_generation += 1
+            logger.info("Saved LeadHoop session state")
+            return True
+    
+    async def _submit_in_session(self, lead: Lead) -> Dict[str, Any]:
+        """
+        Submit a lead in a pooled context restored from the saved login state.
+        
+        Parameters:
+        -----------
+        lead : Lead
+            The lead to submit.
+            
+        Returns:
+        --------
+        Dict[str, Any]
+            Result of the submission.
+        """
+        async with self.context_pool.page() as page:
+            return await submit_lead(page, lead)
     
     async def run(self, batch_size: int = 3, run_once: bool = False):
         """
@@ -409,10 +474,18 @@ class DataEntryAgent:
             return
         
         try:
+            # Launch the shared browser and log in once for the whole run
+            browser = await self.browser_pool.start()
+            if not await self._refresh_login():
+                logger.error("Failed to log in to LeadHoop. Data Entry Agent cannot start.")
+                return
+            await self.context_pool.start(browser, self.state_path)
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_DATA_ENTRIES)
+            
             running = True
             while running:
                 # Get confirmed leads
-                leads = LeadRepository.get_confirmed_leads_for_entry(limit=batch_size)
+                leads = await _repo(LeadRepository.get_confirmed_leads_for_entry, limit=batch_size)
                 
                 if not leads:
                     logger.info("No confirmed leads found for data entry.")
@@ -425,23 +498,12 @@ class DataEntryAgent:
                 
                 logger.info(f"Found {len(leads)} leads for data entry")
                 
-                # Process leads in parallel, up to the concurrent limit
-                tasks = []
-                for lead in leads:
-                    # Skip if we've reached the maximum concurrent entries
-                    if self.active_entries >= MAX_CONCURRENT_DATA_ENTRIES:
-                        logger.info(f"Reached maximum concurrent entries limit ({MAX_CONCURRENT_DATA_ENTRIES})")
-                        break
-                    
-                    # Create a task for processing this lead
-                    task = asyncio.create_task(self.process_lead(lead))
-                    tasks.append(task)
-                    self.active_entries += 1
+                # Mark the whole batch as in progress in one round-trip
+                await _repo(LeadRepository.bulk_mark_in_progress, [lead.id for lead in leads])
                 
-                # Wait for all tasks to complete
-                if tasks:
-                    await asyncio.gather(*tasks)
-                    self.active_entries = 0  # Reset the counter after all tasks are done
+                # Process leads in parallel, bounded by the concurrent limit
+                tasks = [asyncio.create_task(self._bounded(semaphore, lead)) for lead in leads]
+                await asyncio.gather(*tasks, return_exceptions=True)
                 
                 # Exit if run_once is True
                 if run_once:
@@ -452,6 +514,33 @@ class DataEntryAgent:
                 
         except Exception as e:
             logger.error(f"Error in Data Entry Agent run loop: {str(e)}")
+        finally:
+            await self.context_pool.close()
+            await self.browser_pool.close()
+            await flush_screenshots()
+    
+    async def _bounded(self, semaphore: asyncio.Semaphore, lead: Lead) -> bool:
+        """
+        Process a lead while holding a slot of the concurrency semaphore.
+        
+        Parameters:
+        -----------
+        semaphore : asyncio.Semaphore
+            Semaphore limiting the number of concurrent entries.
+        lead : Lead
+            The lead to process.
+            
+        Returns:
+        --------
+        bool
+            Result of process_lead.
+        """
+        async with semaphore:
+            self.active_leads.add(lead.id)
+            try:
+                return await self.process_lead(lead)
+            finally:
+                self.active_leads.discard(lead.id)
     
     async def process_lead(self, lead: Lead) -> bool:
         """
@@ -469,134 +558,137 @@ class DataEntryAgent:
         """
         logger.info(f"Processing lead {lead.id} for data entry: {lead.firstname} {lead.lastname}")
         
+        initiated_at = datetime.utcnow()
+        
         try:
-            # Update lead status to ENTRY_IN_PROGRESS
-            LeadRepository.update_lead_status(
-                lead.id, 
-                LeadStatus.ENTRY_IN_PROGRESS,
-                {
-                    "entry_initiated_at": datetime.utcnow(),
-                    "entry_attempts": lead.entry_attempts + 1
-                }
-            )
+            # Submit the lead using the saved login session
+            generation = self._login_generation
+            result = await self._submit_in_session(lead)
+            
+            # Log in again and retry once if the saved session has expired
+            if result.get("login_required"):
+                logger.info(f"LeadHoop session expired while processing lead {lead.id}, logging in again")
+                if await self._refresh_login(generation):
+                    result = await self._submit_in_session(lead)
             
-            # Initialize the LeadHoop client
-            async with LeadHoopClient(headless=self.headless) as client:
-                page = await client.context.new_page()
+            completed_at = datetime.utcnow()
+            duration = (completed_at - initiated_at).total_seconds()
+            
+            if result.get("login_required"):
+                logger.error(f"Failed to log in to LeadHoop for lead {lead.id}")
                 
-                # Login to LeadHoop
-                login_success = await client.login(page)
-                if not login_success:
-                    logger.error(f"Failed to log in to LeadHoop for lead {lead.id}")
-                    
-                    # Update lead status to ENTRY_FAILED
-                    LeadRepository.update_lead_status(
-                        lead.id, 
-                        LeadStatus.ENTRY_FAILED,
-                        {
-                            "entry_completed_at": datetime.utcnow(),
-                            "last_error": "Failed to log in to LeadHoop portal"
-                        }
-                    )
-                    
-                    # Log the entry attempt
-                    LeadRepository.log_entry(
-                        lead.id,
-                        {
-                            "completed_at": datetime.utcnow(),
-                            "status": "login_failed",
-                            "error": "Failed to log in to LeadHoop portal"
-                        }
-                    )
-                    
-                    return False
+                # Update lead status to ENTRY_FAILED and log the entry attempt
+                await _repo(
+                    LeadRepository.finalize_entry,
+                    lead.id,
+                    LeadStatus.ENTRY_FAILED,
+                    {
+                        "entry_completed_at": completed_at,
+                        "last_error": "Failed to log in to LeadHoop portal"
+                    },
+                    {
+                        "initiated_at": initiated_at,
+                        "completed_at": completed_at,
+                        "status": "login_failed",
+                        "error": "Failed to log in to LeadHoop portal"
+                    }
+                )
                 
-                # Submit the lead
-                start_time = datetime.utcnow()
-                result = await client.submit_lead(page, lead)
-                end_time = datetime.utcnow()
+                return False
+            
+            if result["success"]:
+                # Update lead status to ENTERED and log the entry attempt
+                await _repo(
+                    LeadRepository.finalize_entry,
+                    lead.id,
+                    LeadStatus.ENTERED,
+                    {
+                        "entry_completed_at": completed_at,
+                        "entry_duration": duration,
+                        "entry_notes": result.get("message", "Lead submitted successfully")
+                    },
+                    {
+                        "initiated_at": initiated_at,
+                        "completed_at": completed_at,
+                        "status": "completed",
+                        "duration": duration,
+                        "notes": result.get("message", "Lead submitted successfully")
+                    }
+                )
                 
-                # Calculate duration
-                duration = (end_time - start_time).total_seconds()
+                logger.info(f"Successfully submitted lead {lead.id} to LeadHoop")
+                return True
+            else:
+                # Update lead status to ENTRY_FAILED and log the entry attempt
+                await _repo(
+                    LeadRepository.finalize_entry,
+                    lead.id,
+                    LeadStatus.ENTRY_FAILED,
+                    {
+                        "entry_completed_at": completed_at,
+                        "entry_duration": duration,
+                        "last_error": result.get("error", "Unknown error during submission")
+                    },
+                    {
+                        "initiated_at": initiated_at,
+                        "completed_at": completed_at,
+                        "status": "failed",
+                        "duration": duration,
+                        "error": result.get("error", "Unknown error during submission")
+                    }
+                )
                 
-                if result["success"]:
-                    # Update lead status to ENTERED
-                    LeadRepository.update_lead_status(
-                        lead.id, 
-                        LeadStatus.ENTERED,
-                        {
-                            "entry_completed_at": datetime.utcnow(),
-                            "entry_duration": duration,
-                            "entry_notes": result.get("message", "Lead submitted successfully")
-                        }
-                    )
-                    
-                    # Log the entry
-                    LeadRepository.log_entry(
-                        lead.id,
-                        {
-                            "completed_at": datetime.utcnow(),
-                            "status": "completed",
-                            "duration": duration,
-                            "notes": result.get("message", "Lead submitted successfully")
-                        }
-                    )
-                    
-                    logger.info(f"Successfully submitted lead {lead.id} to LeadHoop")
-                    return True
-                else:
-                    # Update lead status to ENTRY_FAILED
-                    LeadRepository.update_lead_status(
-                        lead.id, 
-                        LeadStatus.ENTRY_FAILED,
-                        {
-                            "entry_completed_at": datetime.utcnow(),
-                            "entry_duration": duration,
-                            "last_error": result.get("error", "Unknown error during submission")
-                        }
-                    )
-                    
-                    # Log the entry attempt
-                    LeadRepository.log_entry(
-                        lead.id,
-                        {
-                            "completed_at": datetime.utcnow(),
-                            "status": "failed",
-                            "duration": duration,
-                            "error": result.get("error", "Unknown error during submission")
-                        }
-                    )
-                    
-                    logger.error(f"Failed to submit lead {lead.id} to LeadHoop: {result.get('error')}")
-                    return False
-            
+                logger.error(f"Failed to submit lead {lead.id} to LeadHoop: {result.get('error')}")
+                return False
+        
         except Exception as e:
             logger.error(f"Error processing lead {lead.id} for data entry: {str(e)}")
+            completed_at = datetime.utcnow()
             
-            # Update lead status to ENTRY_FAILED
-            LeadRepository.update_lead_status(
-                lead.id, 
+            # Update lead status to ENTRY_FAILED and log the entry attempt
+            await _repo(
+                LeadRepository.finalize_entry,
+                lead.id,
                 LeadStatus.ENTRY_FAILED,
                 {
-                    "entry_completed_at": datetime.utcnow(),
+                    "entry_completed_at": completed_at,
                     "last_error": str(e)
-                }
-            )
-            
-            # Log the entry attempt
-            LeadRepository.log_entry(
-                lead.id,
+                },
                 {
-                    "completed_at": datetime.utcnow(),
+                    "initiated_at": initiated_at,
+                    "completed_at": completed_at,
                     "status": "error",
                     "error": str(e)
                 }
             )
             
             return False
-        finally:
-            # Ensure active entries count is decremented even if an exception occurred
-            self.active_entries -= 1
+
+
+def _chromium_installed() -> bool:
+    """
+    Check whether Playwright's Chromium build is present on disk.
+    
+    This avoids starting the Playwright driver just to find out.
+    
+    Returns:
+    --------
+    bool
+        True if a Chromium executable was found, False otherwise.
+    """
+    if os.environ.get("PLAYWRIGHT_BROWSERS_PATH"):
+        browser_dir = Path(os.environ["PLAYWRIGHT_BROWSERS_PATH"])
+    elif sys.platform == "win32":
+        browser_dir = Path(os.environ.get("LOCALAPPDATA", Path.home())) / "ms-playwright"
+    elif sys.platform == "darwin":
+        browser_dir = Path.home() / "Library" / "Caches" / "ms-playwright"
+    else:
+        browser_dir = Path.home() / ".cache" / "ms-playwright"
+    
+    return any(
+        any(browser_dir.glob(pattern))
+        for pattern in CHROMIUM_EXECUTABLE_PATTERNS
+    )
 
 
 async def main():
@@ -614,25 +706,24 @@ async def main():
     parser.add_argument("--batch-size", type=int, default=3, help="Number of leads to process in each batch")
     parser.add_argument("--run-once", action="store_true", help="Process one batch and exit")
     parser.add_argument("--headless", action="store_true", help="Run browser in headless mode")
+    parser.add_argument("--cdp-endpoint", default=BROWSER_CDP_ENDPOINT,
+                        help="Connect to a shared Chromium over CDP (e.g. http://localhost:9222) instead of launching one")
     args = parser.parse_args()
     
+    # Size the thread pool used for repository calls to the entry concurrency
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DATA_ENTRIES * 2)
+    )
+    
     try:
         # Install browsers if needed (first run only)
-        try:
-            from playwright.sync_api import sync_playwright
-            with sync_playwright() as p:
-                # Just to check if browsers are installed
-                pass
-        except Exception as e:
-            if "Executable doesn't exist" in str(e):
-                logger.info("Installing Playwright browsers...")
-                import subprocess
-                subprocess.run(["playwright", "install", "chromium"])
-            else:
-                logger.warning(f"Playwright check error: {str(e)}")
+        if not args.cdp_endpoint and not _chromium_installed():
+            logger.info("Installing Playwright browsers...")
+            import subprocess
+            subprocess.run(["playwright", "install", "chromium"], check=True)
         
         # Initialize and run the Data Entry Agent
-        agent = DataEntryAgent(headless=args.headless)
+        agent = DataEntryAgent(headless=args.headless, cdp_endpoint=args.cdp_endpoint)
         await agent.run(batch_size=args.batch_size, run_once=args.run_once)
     except KeyboardInterrupt:
         logger.info("Data Entry Agent stopped by user")
@@ -0,0 +1,502 @@
+"""
+Page-level operations on the LeadHoop portal.
+
+These functions drive a single Playwright page (log in, fill and submit the
+lead form, inspect the result); browser and context management lives in the
+Data Entry Agent.
+"""
+import os
+import re
+import asyncio
+from datetime import datetime
+from typing import Dict, Any, Optional
+from pathlib import Path
+from operator import attrgetter
+
+from app.database.models import Lead
+from app.config.settings import (
+    LEADHOOP_PORTAL_URL,
+    LEADHOOP_USERNAME,
+    LEADHOOP_PASSWORD,
+    ENTRY_TIMEOUT_SECONDS,
+    SCREENSHOT_DIRECTORY,
+    CAPTURE_SUCCESS_SCREENSHOTS
+)
+from loguru import logger
+
+from playwright.async_api import Page, TimeoutError as PlaywrightTimeoutError
+
+
+# Playwright timeouts are in milliseconds
+ENTRY_TIMEOUT_MS = ENTRY_TIMEOUT_SECONDS * 1000
+
+# How long a submitted form has to answer, and then to show its outcome
+SUBMISSION_RESULT_TIMEOUT_MS = 15 * 1000
+
+# Portal selectors (adjust based on the actual portal)
+LOGIN_USERNAME_SELECTOR = "input[name='username'], input[name='email']"
+SUCCESS_SELECTORS = [
+    ".success-message",
+    ".alert-success",
+    ".confirmation",
+    "h1:has-text('Thank You')",
+    ".success"
+]
+ERROR_SELECTORS = [
+    ".error-message",
+    ".alert-danger",
+    ".form-error",
+    ".validation-summary-errors",
+    ".error"
+]
+ERROR_SELECTOR = ", ".join(ERROR_SELECTORS)
+# Keywords in the URL or page text that indicate the outcome of a submission
+SUCCESS_INDICATORS = [
+    "thank you",
+    "success",
+    "submitted",
+    "received",
+    "confirmation"
+]
+ERROR_INDICATORS = [
+    "error",
+    "failed",
+    "invalid",
+    "problem",
+    "incorrect"
+]
+# Playwright-only pseudo selectors such as :has-text are not valid for querySelector
+DOM_SUCCESS_SELECTOR = ", ".join(selector for selector in SUCCESS_SELECTORS if ":has-text" not in selector)
+# Any element that signals the portal has finished handling a submission (only
+# looked for once the portal has responded to the submitted form)
+DOM_RESULT_SELECTOR = ", ".join([DOM_SUCCESS_SELECTOR, ERROR_SELECTOR])
+
+# Single alternation over all outcome keywords, so the page text is scanned
+# once instead of once per keyword
+# (escaped for a JavaScript RegExp)
+OUTCOME_KEYWORDS_PATTERN = "|".join(
+    re.sub(r"[.*+?^${}()|[\]\\]", r"\\\g<0>", word)
+    for word in SUCCESS_INDICATORS + ERROR_INDICATORS
+)
+
+# True once a submission's outcome shows: a success keyword in the URL or the
+# page text, or a visible success or error message (polled by
+# page.wait_for_function). Error keywords in the text alone don't end the wait,
+# as form labels and hints often contain them.
+SUBMISSION_SHOWN_JS = """
+({okWords, resultSel}) => {
+    const url = location.href.toLowerCase();
+    if (okWords.some(w => url.includes(w))) return true;
+    if (Array.from(document.querySelectorAll(resultSel)).some(el => el.getClientRects().length > 0)) return true;
+    const text = (document.body ? document.body.innerText : '').toLowerCase();
+    return okWords.some(w => text.includes(w));
+}
+"""
+
+# Decides the outcome of a submission in one browser round-trip:
+# "success", "failed" or "unknown". A success keyword in the URL or a success
+# message wins over a visible error message; in the page text, any success
+# keyword wins over error ones.
+VERIFY_SUBMISSION_JS = """
+({okWords, pattern, okSel, errSel}) => {
+    const ok = new Set(okWords);
+    const url = location.href.toLowerCase();
+    for (const w of okWords) if (url.includes(w)) return 'success';
+    if (document.querySelector(okSel)) return 'success';
+    const visible = el => el.getClientRects().length > 0;
+    if (Array.from(document.querySelectorAll(errSel)).some(visible)) return 'failed';
+    const text = (document.body ? document.body.innerText : '').toLowerCase();
+    let verdict = 'unknown';
+    for (const m of text.matchAll(new RegExp(pattern, 'g'))) {
+        if (ok.has(m[0])) return 'success';
+        verdict = 'failed';
+    }
+    return verdict;
+}
+"""
+
+# Lead form fields as (selector, value getter, kind)
+# This mapping will need to be adjusted based on the actual portal's form
+FORM_FIELDS = (
+    # Basic information
+    ("input[name='first_name']", attrgetter("firstname"), "input"),
+    ("input[name='last_name']", attrgetter("lastname"), "input"),
+    ("input[name='email']", lambda lead: lead.confirmed_email or lead.email, "input"),
+    ("input[name='phone']", lambda lead: lead.confirmed_phone or lead.phone1, "input"),
+    
+    # Address
+    ("input[name='address']", lambda lead: lead.confirmed_address or lead.address, "input"),
+    ("input[name='address2']", attrgetter("address2"), "input"),
+    ("input[name='city']", attrgetter("city"), "input"),
+    ("input[name='state']", attrgetter("state"), "input"),
+    ("input[name='zip']", attrgetter("zip"), "input"),
+    
+    # Additional fields
+    ("input[name='education_level']", attrgetter("education_level"), "input"),
+    ("select[name='area_of_study']", lambda lead: lead.confirmed_area_of_interest or lead.area_of_study, "select"),
+    ("input[name='grad_year']", attrgetter("grad_year"), "input"),
+    ("input[name='start_date']", attrgetter("start_date"), "input"),
+)
+
+# Common TCPA checkbox selectors, tried in order
+TCPA_SELECTORS = [
+    "input[name='tcpa_consent']",
+    "input[name='tcpa_opt_in']",
+    "input[id*='tcpa']",
+    "input[id*='consent']",
+    "input[type='checkbox']"
+]
+
+# Fills every field (and the TCPA checkbox) in one browser round-trip.
+# Values go through the native value setter so that React/Vue-controlled inputs
+# see the change; select options match on value or label. Returns the selectors
+# that could not be found and the selects that had no matching option.
+FILL_FORM_JS = """
+({fields, tcpa, tcpaSelectors}) => {
+    const missing = [];
+    const unmatched = [];
+    for (const [sel, val, kind] of fields) {
+        const el = document.querySelector(sel);
+        if (!el) { missing.push(sel); continue; }
+        let value = val;
+        if (kind === 'select') {
+            const wanted = val.trim().toLowerCase();
+            const option = Array.from(el.options).find(
+                o => o.value === val || o.label.trim().toLowerCase() === wanted
+            );
+            if (!option) { unmatched.push(sel); continue; }
+            value = option.value;
+        }
+        const proto = Object.getPrototypeOf(el);
+        const setter = Object.getOwnPropertyDescriptor(proto, 'value').set;
+        setter.call(el, value);
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+    }
+    if (tcpa) {
+        for (const sel of tcpaSelectors) {
+            const box = document.querySelector(sel);
+            if (!box) continue;
+            // A real click, so frameworks update their state as for a user
+            if (!box.checked) box.click();
+            break;
+        }
+    }
+    return {missing, unmatched};
+}
+"""
+
+# Keeps background screenshot writes alive until they finish
+_pending_writes = set()
+
+
+async def _capture_screenshot(page: Page, name: str) -> Optional[str]:
+    """
+    Capture a screenshot and write it to disk in the background.
+    
+    Parameters:
+    -----------
+    page : Page
+        Playwright page object.
+    name : str
+        File name prefix for the screenshot.
+        
+    Returns:
+    --------
+    Optional[str]
+        Path the screenshot is being written to, or None if capture failed.
+    """
+    try:
+        data = await page.screenshot(type="jpeg", quality=60, full_page=False)
+    except Exception as e:
+        logger.warning(f"Could not capture screenshot {name}: {str(e)}")
+        return None
+    
+    path = os.path.join(SCREENSHOT_DIRECTORY, f"{name}_{datetime.now().strftime('%Y%m%d%H%M%S')}.jpg")
+    task = asyncio.create_task(asyncio.to_thread(Path(path).write_bytes, data))
+    _pending_writes.add(task)
+    
+    def _write_done(task: asyncio.Task) -> None:
+        _pending_writes.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Could not write screenshot {path}: {str(task.exception())}")
+    
+    task.add_done_callback(_write_done)
+    return path
+
+
+async def flush_screenshots() -> None:
+    """
+    Wait for the screenshots still being written to disk.
+    
+    Write errors are logged as the writes finish, not raised here.
+    """
+    if _pending_writes:
+        await asyncio.gather(*_pending_writes, return_exceptions=True)
+
+
+async def is_login_page(page: Page) -> bool:
+    """
+    Check whether the page is the portal's login page.
+    
+    Parameters:
+    -----------
+    page : Page
+        Playwright page object.
+        
+    Returns:
+    --------
+    bool
+        True if the URL or title looks like a login page.
+    """
+    if "login" in page.url.lower():
+        return True
+    return "sign in" in (await page.title()).lower()
+
+
+async def login(page: Page) -> bool:
+    """
+    Log in to the LeadHoop portal.
+    
+    Parameters:
+    -----------
+    page : Page
+        Playwright page object.
+        
+    Returns:
+    --------
+    bool
+        True if login successful, False otherwise.
+    """
+    try:
+        # Check if credentials are set
+        if not LEADHOOP_USERNAME or not LEADHOOP_PASSWORD:
+            logger.error("LeadHoop credentials are not set")
+            return False
+        
+        # Navigate to login page (this might need adjustment based on the actual portal)
+        await page.goto(LEADHOOP_PORTAL_URL, wait_until="domcontentloaded")
+        
+        # Check if we're already logged in (this depends on the portal's behavior)
+        if not await is_login_page(page):
+            logger.info("Already logged in to LeadHoop")
+            return True
+        
+        # Find and fill login form
+        await page.wait_for_selector(LOGIN_USERNAME_SELECTOR, state="visible", timeout=ENTRY_TIMEOUT_MS)
+        await page.fill(LOGIN_USERNAME_SELECTOR, LEADHOOP_USERNAME)
+        await page.fill("input[name='password']", LEADHOOP_PASSWORD)
+        
+        # Click login button
+        await page.click("button[type='submit'], input[type='submit']")
+        
+        # Wait until the login form goes away, whether the portal navigates or
+        # re-renders in place (the URL alone may never have said "login")
+        try:
+            await page.wait_for_selector(LOGIN_USERNAME_SELECTOR, state="hidden", timeout=ENTRY_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            logger.error("Login failed - login form is still shown")
+            return False
+        
+        # Verify login was successful
+        if await is_login_page(page):
+            logger.error("Login failed - still on login page")
+            return False
+        
+        logger.info("Successfully logged in to LeadHoop")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Error logging in to LeadHoop: {str(e)}")
+        return False
+
+
+async def submit_lead(page: Page, lead: Lead, capture_success: bool = CAPTURE_SUCCESS_SCREENSHOTS) -> Dict[str, Any]:
+    """
+    Submit a lead to the LeadHoop portal.
+    
+    Parameters:
+    -----------
+    page : Page
+        Playwright page object.
+    lead : Lead
+        The lead to submit.
+        
+    Returns:
+    --------
+    Dict[str, Any]
+        Result of the submission.
+    """
+    try:
+        # Navigate to the submission form
+        await page.goto(LEADHOOP_PORTAL_URL, wait_until="domcontentloaded")
+        
+        # The saved session may have expired and bounced us to the login page
+        if await is_login_page(page):
+            return {
+                "success": False,
+                "lead_id": lead.id,
+                "login_required": True,
+                "error": "LeadHoop session expired - redirected to login page"
+            }
+        
+        # Wait for the form to be visible
+        form_selector = "form"  # Adjust based on the actual portal
+        await page.wait_for_selector(form_selector, state="visible", timeout=ENTRY_TIMEOUT_MS)
+        
+        # Fill in the form fields based on lead data
+        await _fill_lead_form(page, lead)
+        
+        # Take a screenshot for verification (optional)
+        screenshot_path = None
+        if capture_success:
+            screenshot_path = await _capture_screenshot(page, f"lead_{lead.id}")
+        
+        # Submit the form and wait for the portal to answer it (the POST to the
+        # form's action, not other requests the page makes), so that a message
+        # already on the form page isn't taken for the result of the submission
+        action_url = (await page.eval_on_selector(form_selector, "form => form.action")).split("?", 1)[0]
+        try:
+            async with page.expect_response(
+                lambda response: response.request.method == "POST" and response.url.split("?", 1)[0] == action_url,
+                timeout=SUBMISSION_RESULT_TIMEOUT_MS
+            ) as response_info:
+                await page.click("button[type='submit']")
+            await response_info.value
+            await page.wait_for_load_state("domcontentloaded", timeout=SUBMISSION_RESULT_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            logger.warning(f"No response from the portal to the submission of lead {lead.id}")
+        
+        # Wait for the outcome to show in the URL, as a message or in the page text
+        try:
+            await page.wait_for_function(
+                SUBMISSION_SHOWN_JS,
+                arg={"okWords": SUCCESS_INDICATORS, "resultSel": DOM_RESULT_SELECTOR},
+                polling=250,
+                timeout=SUBMISSION_RESULT_TIMEOUT_MS
+            )
+        except PlaywrightTimeoutError:
+            logger.warning(f"No success or error message appeared for lead {lead.id}")
+        
+        # Decide from the URL, the messages and, failing those, the page text
+        success = await _verify_submission_success(page)
+        
+        if success:
+            logger.info(f"Successfully submitted lead {lead.id} to LeadHoop")
+            return {
+                "success": True,
+                "lead_id": lead.id,
+                "screenshot": screenshot_path,
+                "message": "Lead submitted successfully"
+            }
+        else:
+            error_message = await _extract_error_message(page)
+            logger.error(f"Failed to submit lead {lead.id}: {error_message}")
+            return {
+                "success": False,
+                "lead_id": lead.id,
+                "screenshot": await _capture_screenshot(page, f"failed_lead_{lead.id}"),
+                "error": error_message
+            }
+            
+    except Exception as e:
+        logger.error(f"Error submitting lead {lead.id}: {str(e)}")
+        
+        # Try to take a screenshot of the error state
+        error_screenshot = await _capture_screenshot(page, f"error_lead_{lead.id}")
+        
+        return {
+            "success": False,
+            "lead_id": lead.id,
+            "screenshot": error_screenshot,
+            "error": str(e)
+        }
+
+
+async def _fill_lead_form(page: Page, lead: Lead) -> None:
+    """
+    Fill in the LeadHoop form with lead data.
+    
+    Parameters:
+    -----------
+    page : Page
+        Playwright page object.
+    lead : Lead
+        The lead whose data to fill in.
+    """
+    # Fill in all form fields in a single browser round-trip
+    fields = []
+    for selector, get_value, kind in FORM_FIELDS:
+        value = get_value(lead)
+        if value:
+            fields.append((selector, str(value), kind))
+    result = await page.evaluate(FILL_FORM_JS, {
+        "fields": fields,
+        "tcpa": bool(lead.tcpa_accepted),
+        "tcpaSelectors": TCPA_SELECTORS
+    })
+    for selector in result["missing"]:
+        logger.warning(f"Could not fill field {selector}: element not found")
+    for selector in result["unmatched"]:
+        logger.warning(f"Could not fill field {selector}: no option matches the lead's value")
+
+
+async def _verify_submission_success(page: Page) -> bool:
+    """
+    Verify if the form submission was successful.
+    
+    Parameters:
+    -----------
+    page : Page
+        Playwright page object.
+        
+    Returns:
+    --------
+    bool
+        True if submission was successful, False otherwise.
+    """
+    try:
+        verdict = await page.evaluate(VERIFY_SUBMISSION_JS, {
+            "okWords": SUCCESS_INDICATORS,
+            "pattern": OUTCOME_KEYWORDS_PATTERN,
+            "okSel": DOM_SUCCESS_SELECTOR,
+            "errSel": ERROR_SELECTOR
+        })
+        
+        # If we couldn't determine success or failure, default to assuming it worked
+        # This might need adjustment based on the portal's behavior
+        return verdict != "failed"
+        
+    except Exception as e:
+        logger.error(f"Error verifying submission success: {str(e)}")
+        return False
+
+
+async def _extract_error_message(page: Page) -> str:
+    """
+    Extract error message from the page after a failed submission.
+    
+    Parameters:
+    -----------
+    page : Page
+        Playwright page object.
+        
+    Returns:
+    --------
+    str
+        Extracted error message, or a generic message if none found.
+    """
+    try:
+        # Look for the first common error message element in one query
+        element = await page.query_selector(ERROR_SELECTOR)
+        if element:
+            message = (await element.text_content() or "").strip()
+            if message:
+                return message
+        
+        # If no specific error message found, return generic one
+        return "Form submission failed without a specific error message"
+        
+    except Exception as e:
+        logger.error(f"Error extracting error message: {str(e)}")
+        return "Error extracting error message from page"
\ No newline at end of file
@@ -1,11 +1,13 @@
 import os
 import sys
 import time
-import json
+import orjson
+import random
 import asyncio
-import requests
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+import threading
+import httpx
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set, Tuple
 from pathlib import Path
 import tempfile
 
@@ -18,6 +20,7 @@ from app.utils.s3_utils import s3_manager
 from app.config.settings import (
     ASSISTABLE_API_KEY, 
     ASSISTABLE_API_URL,
+    ASSISTABLE_CALLBACK_URL,
     MAX_CONCURRENT_CALLS, 
     CALL_RETRY_ATTEMPTS,
     CALL_TIMEOUT_SECONDS,
@@ -26,6 +29,258 @@ from app.config.settings import (
 from loguru import logger
 
 
+# Timeout for Assistable.AI API requests (fail fast on an unreachable host)
+API_REQUEST_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+
+# Chunk size used when streaming call recordings to disk
+RECORDING_CHUNK_SIZE = 64 * 1024
+
+# Call status polling backoff, per call (used when no completion webhook is configured)
+POLL_INITIAL_DELAY_SECONDS = 1.0
+POLL_MAX_DELAY_SECONDS = 10.0
+POLL_JITTER_SECONDS = 0.5
+
+# Call status polling interval when a completion webhook is configured, in case
+# an event is lost or reaches an API process without the agent
+WEBHOOK_FALLBACK_POLL_SECONDS = 30.0
+
+# Responses from GET /calls?ids= meaning the bulk status endpoint isn't available
+BULK_STATUS_UNSUPPORTED_CODES = frozenset({404, 405, 501})
+
+# Call statuses after which a call will not change any more
+TERMINAL_CALL_STATUSES = frozenset({"completed", "failed", "no-answer", "busy", "canceled"})
+
+# Running voice agents, so that call events received by the API (in the same
+# process) can be routed to the agent waiting on that call
+_registered_agents = set()
+
+# Keeps background recording clean-ups alive until they finish
+_pending_removals = set()
+
+
+def _fail_payload(lead: Lead, error: str, log_status: str, now: datetime) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Build the lead fields and call log data for a failed call.
+    
+    Parameters:
+    -----------
+    lead : Lead
+        The lead that was called.
+    error : str
+        The error message.
+    log_status : str
+        Status recorded on the call log.
+    now : datetime
+        Time at which the call ended.
+        
+    Returns:
+    --------
+    Tuple[Dict[str, Any], Dict[str, Any]]
+        The lead fields and the call log data, as taken by LeadRepository.finalize_call.
+    """
+    return (
+        {"call_initiated_at": lead.call_initiated_at, "call_completed_at": now, "last_error": error},
+        {"completed_at": now, "status": log_status, "error": error}
+    )
+
+
+def _dumps_notes(responses: Dict[str, Any]) -> str:
+    """
+    Serialize call responses to the compact JSON stored as call notes.
+    
+    Parameters:
+    -----------
+    responses : Dict[str, Any]
+        Transcript responses keyed on script section.
+        
+    Returns:
+    --------
+    str
+        The JSON document.
+    """
+    return orjson.dumps(responses).decode()
+
+
+def _remove_recording(file_path: str) -> None:
+    """
+    Delete a temporary recording file, logging rather than raising on failure.
+    
+    Parameters:
+    -----------
+    file_path : str
+        Path to the recording file.
+    """
+    try:
+        os.remove(file_path)
+    except Exception as e:
+        logger.warning(f"Failed to delete temporary recording file: {str(e)}")
+
+
+def dispatch_call_event(call_id: str) -> bool:
+    """
+    Have the agent waiting on a call check its status now.
+    
+    The event only triggers a status request to Assistable.AI; its payload is
+    never used as the call result. Safe to call from any thread (the API
+    server runs its own event loop).
+    
+    Parameters:
+    -----------
+    call_id : str
+        The ID of the call the event is about.
+        
+    Returns:
+    --------
+    bool
+        True if an agent in this process was waiting on the call, False
+        otherwise (the call is then picked up by that agent's fallback poll).
+    """
+    for agent in list(_registered_agents):
+        if agent.loop and call_id in agent.completion_events:
+            agent.loop.call_soon_threadsafe(agent._poll_now, call_id)
+            return True
+    return False
+
+
+# Call script sections that do not depend on the lead, built once at import
+_SCRIPT_SECTIONS = {
+    "verify_identity": [
+        {
+            "message": "Great! To confirm I'm speaking with the right person, could you please confirm your email address?",
+            "responses": {
+                "confirmed": {"next": "verify_address"},
+                "incorrect": {"message": "I apologize for the confusion. Let me double-check our records.", "next": "end_call"},
+                "unknown": {"message": "No problem. Let's move forward.", "next": "verify_address"}
+            }
+        }
+    ],
+    
+    "collect_address": [
+        {
+            "message": "Thank you for that updated information. I've made a note of your new address.",
+            "next": "verify_education"
+        }
+    ],
+    
+    "collect_education": [
+        {
+            "message": "Thank you for updating that information.",
+            "next": "area_of_interest"
+        }
+    ],
+    
+    "area_of_interest": [
+        {
+            "message": "What specific area of study are you most interested in pursuing?",
+            "next": "tcpa_compliance"
+        }
+    ],
+    
+    "tcpa_compliance": [
+        {
+            "message": TCPA_COMPLIANCE_TEXT,
+            "responses": {
+                "yes": {"message": "Thank you for confirming.", "next": "conclusion"},
+                "no": {"message": "That's absolutely fine. We can still proceed with your request.", "next": "conclusion"}
+            }
+        }
+    ],
+    
+    "conclusion": [
+        {
+            "message": "Thank you for confirming your information. We will match you with educational institutions that offer programs in your area of interest. You can expect to hear from them soon. Do you have any questions before we conclude this call?",
+            "responses": {
+                "yes": {"message": "I'll note your question for our enrollment specialists, who will address it when they contact you.", "next": "end_call"},
+                "no": {"next": "end_call"}
+            }
+        }
+    ],
+    
+    "end_call": [
+        {
+            "message": "Thank you for your time today. Have a great day!"
+        }
+    ]
+}
+
+_VERIFY_ADDRESS_RESPONSES = {
+    "yes": {"next": "verify_education"},
+    "no": {"message": "I'll make a note to update our records. What is your current address?", "next": "collect_address"}
+}
+
+_VERIFY_EDUCATION_RESPONSES = {
+    "yes": {"next": "area_of_interest"},
+    "no": {"message": "What level of education are you interested in now?", "next": "collect_education"}
+}
+
+
+def _on_verify_identity(response: Dict[str, Any], ctx: Dict[str, Any]) -> None:
+    if response.get("confirmed"):
+        ctx["confirmed_email"] = response.get("value")
+
+
+def _on_collect_address(response: Dict[str, Any], ctx: Dict[str, Any]) -> None:
+    ctx["confirmed_address"] = response.get("value")
+
+
+def _on_verify_education(response: Dict[str, Any], ctx: Dict[str, Any]) -> None:
+    if response.get("response") == "no":
+        ctx["interested"] = False
+
+
+def _on_area_of_interest(response: Dict[str, Any], ctx: Dict[str, Any]) -> None:
+    ctx["confirmed_area_of_interest"] = response.get("value")
+    if response.get("response") == "no":
+        ctx["interested"] = False
+
+
+def _on_tcpa_compliance(response: Dict[str, Any], ctx: Dict[str, Any]) -> None:
+    if response.get("response") == "yes":
+        ctx["tcpa_accepted"] = True
+
+
+# Transcript section handlers, keyed on script section name
+_TRANSCRIPT_HANDLERS = {
+    "verify_identity": _on_verify_identity,
+    "collect_address": _on_collect_address,
+    "verify_education": _on_verify_education,
+    "area_of_interest": _on_area_of_interest,
+    "tcpa_compliance": _on_tcpa_compliance
+}
+
+
+def _parse_call_responses(responses: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Extract the confirmed lead information from a call transcript in one pass.
+    
+    This depends on the response format from Assistable.AI; sections without
+    a handler are ignored.
+    
+    Parameters:
+    -----------
+    responses : Dict[str, Dict[str, Any]]
+        Transcript responses keyed on script section.
+        
+    Returns:
+    --------
+    Dict[str, Any]
+        The confirmed lead fields, plus "interested" (True unless the lead
+        explicitly declined).
+    """
+    ctx = {
+        "confirmed_email": None,
+        "confirmed_address": None,
+        "confirmed_area_of_interest": None,
+        "tcpa_accepted": False,
+        "interested": True
+    }
+    for section, response in responses.items():
+        handler = _TRANSCRIPT_HANDLERS.get(section)
+        if handler:
+            handler(response, ctx)
+    return ctx
+
+
 class AssistableAIClient:
     """
     Client for interacting with the Assistable.AI API.
@@ -48,8 +303,52 @@ class AssistableAIClient:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        
+        # Shared connection pool for all API requests
+        # Over HTTP/2 concurrent requests share one multiplexed connection; the
+        # limits only matter if the server falls back to HTTP/1.1
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            http2=True,
+            timeout=API_REQUEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=MAX_CONCURRENT_CALLS * 2,
+                max_keepalive_connections=MAX_CONCURRENT_CALLS * 2
+            )
+        )
+        
+        # Recording URLs point at another host and must not receive our API
+        # credentials, so downloads get their own keep-alive pool
+        self._download_client = httpx.AsyncClient(
+            timeout=CALL_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=MAX_CONCURRENT_CALLS,
+                max_keepalive_connections=MAX_CONCURRENT_CALLS
+            )
+        )
+        
+        # Cleared once the API turns out not to offer GET /calls?ids=
+        self._bulk_status_supported = True
     
-    def make_call(self, phone_number: str, lead_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def aclose(self) -> None:
+        """
+        Close the underlying HTTP connection pools.
+        """
+        await self._client.aclose()
+        await self._download_client.aclose()
+    
+    async def warmup(self) -> None:
+        """
+        Open a keep-alive connection to the API ahead of the first call.
+        
+        The response itself is irrelevant; failures are only logged.
+        """
+        try:
+            await self._client.head(self.api_url)
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not warm up connection to Assistable.AI: {str(e)}")
+    
+    async def make_call(self, phone_number: str, lead_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Make an outbound call to a lead using Assistable.AI.
         
@@ -72,25 +371,26 @@ class AssistableAIClient:
                 "call_script": self._generate_call_script(lead_data),
                 "voice_id": "en-US-Neural2-F",  # Female voice
                 "record_call": True,
-                "callback_url": "https://your-webhook-url.com/call-events",  # Replace with your webhook URL
                 "metadata": {
                     "lead_id": lead_data.get("id"),
                     "type": "lead_verification"
                 }
             }
+            if ASSISTABLE_CALLBACK_URL:
+                payload["callback_url"] = ASSISTABLE_CALLBACK_URL
             
             # Make the API call
-            response = requests.post(
+            response = await self._client.post(
                 f"{self.api_url}/calls",
-                headers=self.headers,
-                json=payload
+                content=orjson.dumps(payload)
             )
             
             if response.status_code == 200:
+                data = orjson.loads(response.content)
                 return {
                     "success": True,
-                    "call_id": response.json().get("call_id"),
-                    "status": response.json().get("status")
+                    "call_id": data.get("call_id"),
+                    "status": data.get("status")
                 }
             else:
                 logger.error(f"Failed to make call: {response.text}")
@@ -107,7 +407,7 @@ class AssistableAIClient:
                 "error": str(e)
             }
     
-    def get_call_status(self, call_id: str) -> Dict[str, Any]:
+    async def get_call_status(self, call_id: str) -> Dict[str, Any]:
         """
         Check the status of a call.
         
@@ -122,16 +422,14 @@ class AssistableAIClient:
             Call status details.
         """
         try:
-            response = requests.get(
-                f"{self.api_url}/calls/{call_id}",
-                headers=self.headers
-            )
+            response = await self._client.get(f"{self.api_url}/calls/{call_id}")
             
             if response.status_code == 200:
+                data = orjson.loads(response.content)
                 return {
                     "success": True,
-                    "status": response.json().get("status"),
-                    "details": response.json()
+                    "status": data.get("status"),
+                    "details": data
                 }
             else:
                 logger.error(f"Failed to get call status: {response.text}")
@@ -148,7 +446,86 @@ class AssistableAIClient:
                 "error": str(e)
             }
     
-    def download_recording(self, call_id: str, output_path: Optional[str] = None) -> Dict[str, Any]:
+    async def get_call_statuses(self, call_ids: List[str]) -> Dict[str, Any]:
+        """
+        Check the status of several calls, in a single request where possible.
+        
+        Calls missing from the bulk response, or all of them if the bulk
+        request fails, are checked one by one with get_call_status. If the API
+        doesn't offer the bulk endpoint, it is not tried again.
+        
+        Parameters:
+        -----------
+        call_ids : List[str]
+            The IDs of the calls to check.
+            
+        Returns:
+        --------
+        Dict[str, Any]
+            Response with "calls", a list of call details each carrying its
+            "call_id" and "status". Calls whose status could not be fetched
+            are left out.
+        """
+        calls = {}
+        if self._bulk_status_supported:
+            bulk_response = await self._get_call_statuses_bulk(call_ids)
+            if bulk_response["success"]:
+                calls = {call.get("call_id"): call for call in bulk_response["calls"]}
+            elif bulk_response.get("status_code") in BULK_STATUS_UNSUPPORTED_CODES:
+                logger.warning("Bulk call status endpoint unavailable; checking calls one by one")
+                self._bulk_status_supported = False
+        
+        missing = [call_id for call_id in call_ids if call_id not in calls]
+        if missing:
+            status_responses = await asyncio.gather(*(self.get_call_status(call_id) for call_id in missing))
+            for call_id, status_response in zip(missing, status_responses):
+                if status_response["success"]:
+                    calls[call_id] = {**status_response["details"], "call_id": call_id}
+        
+        return {
+            "success": True,
+            "calls": list(calls.values())
+        }
+    
+    async def _get_call_statuses_bulk(self, call_ids: List[str]) -> Dict[str, Any]:
+        """
+        Check the status of several calls with one GET /calls?ids= request.
+        
+        Parameters:
+        -----------
+        call_ids : List[str]
+            The IDs of the calls to check.
+            
+        Returns:
+        --------
+        Dict[str, Any]
+            Response with "calls", a list of call details each carrying its
+            "call_id" and "status".
+        """
+        try:
+            response = await self._client.get(f"{self.api_url}/calls", params={"ids": ",".join(call_ids)})
+            
+            if response.status_code == 200:
+                return {
+                    "success": True,
+                    "calls": orjson.loads(response.content).get("calls", [])
+                }
+            else:
+                logger.error(f"Failed to get call statuses: {response.text}")
+                return {
+                    "success": False,
+                    "error": response.text,
+                    "status_code": response.status_code
+                }
+                
+        except Exception as e:
+            logger.error(f"Error getting call statuses: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    async def download_recording(self, call_id: str, output_path: Optional[str] = None) -> Dict[str, Any]:
         """
         Download the recording of a call.
         
@@ -171,13 +548,10 @@ class AssistableAIClient:
                 output_path = os.path.join(temp_dir, f"call_{call_id}.mp3")
             
             # Get recording URL
-            response = requests.get(
-                f"{self.api_url}/calls/{call_id}/recording",
-                headers=self.headers
-            )
+            response = await self._client.get(f"{self.api_url}/calls/{call_id}/recording")
             
             if response.status_code == 200:
-                recording_url = response.json().get("recording_url")
+                recording_url = orjson.loads(response.content).get("recording_url")
                 
                 if not recording_url:
                     return {
@@ -186,26 +560,29 @@ class AssistableAIClient:
                         "file_path": None
                     }
                 
-                # Download the recording
-                download_response = requests.get(recording_url)
-                
-                if download_response.status_code == 200:
-                    with open(output_path, "wb") as f:
-                        f.write(download_response.content)
+                # Stream the recording to disk instead of buffering it in memory
+                async with self._download_client.stream("GET", recording_url) as download_response:
+                    if download_response.status_code != 200:
+                        error_text = (await download_response.aread()).decode(errors="replace")
+                        logger.error(f"Failed to download recording: {error_text}")
+                        return {
+                            "success": False,
+                            "error": error_text,
+                            "status_code": download_response.status_code,
+                            "file_path": None
+                        }
                     
-                    return {
-                        "success": True,
-                        "file_path": output_path,
-                        "file_size": len(download_response.content)
-                    }
-                else:
-                    logger.error(f"Failed to download recording: {download_response.text}")
-                    return {
-                        "success": False,
-                        "error": download_response.text,
-                        "status_code": download_response.status_code,
-                        "file_path": None
-                    }
+                    file_size = 0
+                    with open(output_path, "wb") as f:
+                        async for chunk in download_response.aiter_bytes(RECORDING_CHUNK_SIZE):
+                            f.write(chunk)
+                            file_size += len(chunk)
+                
+                return {
+                    "success": True,
+                    "file_path": output_path,
+                    "file_size": file_size
+                }
             else:
                 logger.error(f"Failed to get recording URL: {response.text}")
                 return {
@@ -241,90 +618,34 @@ class AssistableAIClient:
         last_name = lead_data.get("lastname", "")
         full_name = f"{first_name} {last_name}".strip()
         
-        # Build the script with conversation flow
-        script = {
+        # Only the lead-specific sections are built per call; the rest are shared
+        return {
             "intro": f"Hello, may I speak with {full_name}? This is calling from IEIM Corporation about your recent inquiry regarding educational opportunities.",
             
-            "verify_identity": [
-                {
-                    "message": f"Great! To confirm I'm speaking with the right person, could you please confirm your email address?",
-                    "responses": {
-                        "confirmed": {"next": "verify_address"},
-                        "incorrect": {"message": "I apologize for the confusion. Let me double-check our records.", "next": "end_call"},
-                        "unknown": {"message": "No problem. Let's move forward.", "next": "verify_address"}
-                    }
-                }
-            ],
+            "verify_identity": _SCRIPT_SECTIONS["verify_identity"],
             
             "verify_address": [
                 {
                     "message": f"Thank you. And I have your address as {lead_data.get('address', '')}, {lead_data.get('city', '')}, {lead_data.get('state', '')} {lead_data.get('zip', '')}. Is that correct?",
-                    "responses": {
-                        "yes": {"next": "verify_education"},
-                        "no": {"message": "I'll make a note to update our records. What is your current address?", "next": "collect_address"}
-                    }
+                    "responses": _VERIFY_ADDRESS_RESPONSES
                 }
             ],
             
-            "collect_address": [
-                {
-                    "message": "Thank you for that updated information. I've made a note of your new address.",
-                    "next": "verify_education"
-                }
-            ],
+            "collect_address": _SCRIPT_SECTIONS["collect_address"],
             
             "verify_education": [
                 {
                     "message": f"I see you're interested in {lead_data.get('education_level', 'higher education')}. Is that still the case?",
-                    "responses": {
-                        "yes": {"next": "area_of_interest"},
-                        "no": {"message": "What level of education are you interested in now?", "next": "collect_education"}
-                    }
-                }
-            ],
-            
-            "collect_education": [
-                {
-                    "message": "Thank you for updating that information.",
-                    "next": "area_of_interest"
-                }
-            ],
-            
-            "area_of_interest": [
-                {
-                    "message": "What specific area of study are you most interested in pursuing?",
-                    "next": "tcpa_compliance"
-                }
-            ],
-            
-            "tcpa_compliance": [
-                {
-                    "message": f"{TCPA_COMPLIANCE_TEXT}",
-                    "responses": {
-                        "yes": {"message": "Thank you for confirming.", "next": "conclusion"},
-                        "no": {"message": "That's absolutely fine. We can still proceed with your request.", "next": "conclusion"}
-                    }
+                    "responses": _VERIFY_EDUCATION_RESPONSES
                 }
             ],
             
-            "conclusion": [
-                {
-                    "message": "Thank you for confirming your information. We will match you with educational institutions that offer programs in your area of interest. You can expect to hear from them soon. Do you have any questions before we conclude this call?",
-                    "responses": {
-                        "yes": {"message": "I'll note your question for our enrollment specialists, who will address it when they contact you.", "next": "end_call"},
-                        "no": {"next": "end_call"}
-                    }
-                }
-            ],
-            
-            "end_call": [
-                {
-                    "message": "Thank you for your time today. Have a great day!"
-                }
-            ]
+            "collect_education": _SCRIPT_SECTIONS["collect_education"],
+            "area_of_interest": _SCRIPT_SECTIONS["area_of_interest"],
+            "tcpa_compliance": _SCRIPT_SECTIONS["tcpa_compliance"],
+            "conclusion": _SCRIPT_SECTIONS["conclusion"],
+            "end_call": _SCRIPT_SECTIONS["end_call"]
         }
-        
-        return script
 
 
 class VoiceAgent:
@@ -335,9 +656,58 @@ class VoiceAgent:
     def __init__(self):
         """
         Initialize the Voice Agent.
+        
+        Raises:
+        -------
+        ValueError
+            If ASSISTABLE_API_KEY is not set.
         """
+        if not ASSISTABLE_API_KEY:
+            raise ValueError("ASSISTABLE_API_KEY is not set. Voice Agent cannot start.")
+        
         self.assistable_client = AssistableAIClient()
         self.active_calls = {}  # Tracks currently active calls
+        self.completion_events: Dict[str, asyncio.Event] = {}  # Set when the poller sees a call end
+        self.completion_payloads: Dict[str, Dict[str, Any]] = {}
+        self._poll_schedule: Dict[str, Tuple[float, float]] = {}  # Call ID -> (next poll time, current delay)
+        self._poll_wakeup = asyncio.Event()  # Set when a call is due for polling earlier than planned
+        # With a completion webhook, polling is only a fallback for lost events
+        self._poll_base_delay = WEBHOOK_FALLBACK_POLL_SECONDS if ASSISTABLE_CALLBACK_URL else POLL_INITIAL_DELAY_SECONDS
+        self.loop = None
+        self.sem = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+        self._inflight_phones: Set[str] = set()  # Phone numbers with a call in progress
+        self._claimed: Dict[int, Lead] = {}  # Leads claimed (CALLING) but not called yet
+    
+    def _poll_now(self, call_id: str) -> None:
+        """
+        Make a call due for a status check and wake up the poller.
+        
+        Runs on the agent's event loop (see dispatch_call_event).
+        
+        Parameters:
+        -----------
+        call_id : str
+            The ID of the call.
+        """
+        if call_id in self._poll_schedule:
+            self._poll_schedule[call_id] = (time.monotonic(), self._poll_schedule[call_id][1])
+            self._poll_wakeup.set()
+    
+    def _complete_call(self, call_id: str, payload: Dict[str, Any]) -> None:
+        """
+        Record a polled call status and wake up the task monitoring the call.
+        
+        Parameters:
+        -----------
+        call_id : str
+            The ID of the call.
+        payload : Dict[str, Any]
+            The call details returned by the Assistable.AI API.
+        """
+        event = self.completion_events.get(call_id)
+        if event and payload.get("status") in TERMINAL_CALL_STATUSES:
+            self.completion_payloads[call_id] = payload
+            event.set()
     
     async def run(self, batch_size: int = 5, run_once: bool = False):
         """
@@ -352,52 +722,145 @@ class VoiceAgent:
         """
         logger.info(f"Starting Voice Agent (batch size: {batch_size}, run_once: {run_once})")
         
-        if not ASSISTABLE_API_KEY:
-            logger.error("ASSISTABLE_API_KEY is not set. Voice Agent cannot start.")
-            return
+        await self.assistable_client.warmup()
+        
+        self.loop = asyncio.get_running_loop()
+        _registered_agents.add(self)
+        
+        leads_queue = asyncio.Queue(maxsize=batch_size * 2)
+        tasks = [asyncio.create_task(self._produce_leads(leads_queue, batch_size, run_once))]
+        tasks += [
+            asyncio.create_task(self._consume_leads(leads_queue))
+            for _ in range(MAX_CONCURRENT_CALLS)
+        ]
+        
+        # One shared poller checks all active calls (call event webhooks only
+        # bring a call's next check forward)
+        poller = asyncio.create_task(self._poll_call_statuses())
         
         try:
-            running = True
-            while running:
-                # Get pending leads
-                leads = LeadRepository.get_pending_leads_for_calling(limit=batch_size)
+            await asyncio.gather(*tasks)
+        except Exception as e:
+            logger.error(f"Error in Voice Agent run loop: {str(e)}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            poller.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            
+            # Leads still queued or waiting for a call slot go back to PENDING
+            # instead of being left in CALLING
+            if self._claimed:
+                released = await asyncio.to_thread(LeadRepository.release_claimed_leads, list(self._claimed))
+                logger.info(f"Released {released} claimed leads that were not called")
+                self._claimed.clear()
+            
+            _registered_agents.discard(self)
+            await self.assistable_client.aclose()
+    
+    async def _poll_call_statuses(self):
+        """
+        Poll the status of active calls and wake up their monitors.
+        
+        Each call is polled on its own backoff schedule: first after
+        POLL_INITIAL_DELAY_SECONDS, then at intervals growing 1.5x up to
+        POLL_MAX_DELAY_SECONDS, plus jitter so calls don't poll in lockstep.
+        With a completion webhook configured, calls are polled every
+        WEBHOOK_FALLBACK_POLL_SECONDS instead, and sooner when an event arrives.
+        The calls due at the same time share one status request.
+        """
+        while True:
+            now = time.monotonic()
+            next_due = min(
+                (due_at for due_at, _ in self._poll_schedule.values()),
+                default=now + POLL_MAX_DELAY_SECONDS
+            )
+            try:
+                await asyncio.wait_for(self._poll_wakeup.wait(), timeout=max(next_due - now, 0))
+            except asyncio.TimeoutError:
+                pass
+            self._poll_wakeup.clear()
+            
+            now = time.monotonic()
+            call_ids = [call_id for call_id, (due_at, _) in self._poll_schedule.items() if due_at <= now]
+            if not call_ids:
+                continue
+            
+            status_response = await self.assistable_client.get_call_statuses(call_ids)
+            calls = {call.get("call_id"): call for call in status_response["calls"]}
+            
+            now = time.monotonic()
+            for call_id in call_ids:
+                if call_id not in self._poll_schedule:
+                    continue  # Finished while the request was in flight
                 
-                if not leads:
-                    logger.info("No pending leads found for calling.")
-                    if run_once:
-                        break
-                    
-                    # Wait before checking again
-                    await asyncio.sleep(30)
-                    continue
+                call = calls.get(call_id)
+                if call is None:
+                    # Don't let backoff stretch out recovery from a transient error
+                    delay = self._poll_base_delay
+                else:
+                    logger.debug("Call {} status: {}", call_id, call.get("status"))
+                    self._complete_call(call_id, call)
+                    delay = min(self._poll_schedule[call_id][1] * 1.5, max(POLL_MAX_DELAY_SECONDS, self._poll_base_delay))
                 
+                self._poll_schedule[call_id] = (now + delay + random.uniform(0, POLL_JITTER_SECONDS), delay)
+    
+    async def _produce_leads(self, leads_queue: asyncio.Queue, batch_size: int, run_once: bool):
+        """
+        Fetch pending leads and feed them to the call consumers.
+        
+        The next batch is fetched while the previous one is still being called.
+        
+        Parameters:
+        -----------
+        leads_queue : asyncio.Queue
+            Queue the consumers take leads from.
+        batch_size : int
+            Number of leads to fetch at a time.
+        run_once : bool
+            If True, fetch a single batch and then stop the consumers.
+        """
+        while True:
+            try:
+                leads = await asyncio.to_thread(LeadRepository.claim_leads_for_calling, limit=batch_size)
+            except Exception as e:
+                # e.g. the claim hit the statement timeout; try again after the idle wait
+                logger.error(f"Error claiming leads for calling: {str(e)}")
+                leads = []
+            
+            if leads:
                 logger.info(f"Found {len(leads)} leads for calling")
-                
-                # Process each lead
-                tasks = []
+                self._claimed.update((lead.id, lead) for lead in leads)
                 for lead in leads:
-                    # Skip if we've reached the maximum concurrent calls
-                    if len(self.active_calls) >= MAX_CONCURRENT_CALLS:
-                        logger.info(f"Reached maximum concurrent calls limit ({MAX_CONCURRENT_CALLS})")
-                        break
-                    
-                    # Create a task for processing this lead
-                    task = asyncio.create_task(self.process_lead(lead))
-                    tasks.append(task)
-                
-                # Wait for all tasks to complete
-                if tasks:
-                    await asyncio.gather(*tasks)
-                
-                # Exit if run_once is True
-                if run_once:
-                    running = False
-                else:
-                    # Wait before processing the next batch
-                    await asyncio.sleep(5)
-                
-        except Exception as e:
-            logger.error(f"Error in Voice Agent run loop: {str(e)}")
+                    await leads_queue.put(lead)
+            else:
+                logger.info("No pending leads found for calling.")
+            
+            if run_once:
+                break
+            
+            # Wait before checking again
+            await asyncio.sleep(5 if leads else 30)
+        
+        # One sentinel per consumer
+        for _ in range(MAX_CONCURRENT_CALLS):
+            await leads_queue.put(None)
+    
+    async def _consume_leads(self, leads_queue: asyncio.Queue):
+        """
+        Call leads from the queue until a sentinel is received.
+        
+        Parameters:
+        -----------
+        leads_queue : asyncio.Queue
+            Queue the producer puts leads on.
+        """
+        while True:
+            lead = await leads_queue.get()
+            if lead is None:
+                break
+            
+            await self.process_lead(lead)
     
     async def process_lead(self, lead: Lead) -> bool:
         """
@@ -406,109 +869,101 @@ class VoiceAgent:
         Parameters:
         -----------
         lead : Lead
-            The lead to process.
+            The lead to process, already claimed (CALLING) by
+            LeadRepository.claim_leads_for_calling.
             
         Returns:
         --------
         bool
             True if the lead was processed successfully, False otherwise.
         """
-        logger.info(f"Processing lead {lead.id}: {lead.firstname} {lead.lastname}")
+        # Never ring the same number twice (duplicate rows, restarts mid-call):
+        # a lead whose number is already being called is closed without a call
+        if lead.phone1 in self._inflight_phones:
+            logger.warning(f"Skipping lead {lead.id}: a call to {lead.phone1} is already in progress")
+            self._claimed.pop(lead.id, None)
+            await asyncio.to_thread(
+                LeadRepository.finalize_call,
+                lead.id,
+                LeadStatus.CALL_FAILED,
+                *_fail_payload(lead, "Duplicate phone number: a call to it was already in progress", "duplicate", datetime.utcnow())
+            )
+            return False
+        
+        if lead.phone1:
+            self._inflight_phones.add(lead.phone1)
         
         try:
-            # Update lead status to CALLING
-            LeadRepository.update_lead_status(
-                lead.id, 
-                LeadStatus.CALLING,
-                {
-                    "call_initiated_at": datetime.utcnow(),
-                    "call_attempts": lead.call_attempts + 1
-                }
-            )
-            
-            # Convert lead to dictionary for API call
-            lead_data = {
-                "id": lead.id,
-                "firstname": lead.firstname,
-                "lastname": lead.lastname,
-                "email": lead.email,
-                "phone1": lead.phone1,
-                "address": lead.address,
-                "address2": lead.address2,
-                "city": lead.city,
-                "state": lead.state,
-                "zip": lead.zip,
-                "education_level": lead.education_level,
-                "area_of_study": lead.area_of_study
-            }
-            
-            # Make the call
-            call_response = self.assistable_client.make_call(lead.phone1, lead_data)
-            
-            if not call_response["success"]:
-                logger.error(f"Failed to initiate call for lead {lead.id}: {call_response.get('error')}")
+            async with self.sem:
+                logger.info("Processing lead {}: {} {}", lead.id, lead.firstname, lead.lastname)
                 
-                # Update lead status to CALL_FAILED
-                LeadRepository.update_lead_status(
-                    lead.id, 
-                    LeadStatus.CALL_FAILED,
-                    {
-                        "call_completed_at": datetime.utcnow(),
-                        "last_error": call_response.get("error", "Failed to initiate call")
-                    }
-                )
-                
-                # Log the call
-                LeadRepository.log_call(
-                    lead.id,
-                    {
-                        "completed_at": datetime.utcnow(),
-                        "status": "failed",
-                        "error": call_response.get("error", "Failed to initiate call")
+                try:
+                    # Convert lead to dictionary for API call
+                    lead_data = {
+                        "id": lead.id,
+                        "firstname": lead.firstname,
+                        "lastname": lead.lastname,
+                        "email": lead.email,
+                        "phone1": lead.phone1,
+                        "address": lead.address,
+                        "address2": lead.address2,
+                        "city": lead.city,
+                        "state": lead.state,
+                        "zip": lead.zip,
+                        "education_level": lead.education_level,
+                        "area_of_study": lead.area_of_study
                     }
-                )
-                
-                return False
-            
-            # Call was initiated successfully
-            call_id = call_response["call_id"]
-            self.active_calls[call_id] = lead.id
-            
-            # Monitor the call until completion
-            completed = await self._monitor_call(call_id, lead.id)
-            
-            # Clean up
-            if call_id in self.active_calls:
-                del self.active_calls[call_id]
-            
-            return completed
-            
-        except Exception as e:
-            logger.error(f"Error processing lead {lead.id}: {str(e)}")
-            
-            # Update lead status to CALL_FAILED
-            LeadRepository.update_lead_status(
-                lead.id, 
-                LeadStatus.CALL_FAILED,
-                {
-                    "call_completed_at": datetime.utcnow(),
-                    "last_error": str(e)
-                }
-            )
-            
-            # Log the call
-            LeadRepository.log_call(
-                lead.id,
-                {
-                    "completed_at": datetime.utcnow(),
-                    "status": "error",
-                    "error": str(e)
-                }
-            )
-            
-            return False
+                    
+                    # Make the call; from here on the lead counts as called
+                    self._claimed.pop(lead.id, None)
+                    lead.call_initiated_at = datetime.utcnow()
+                    call_response = await self.assistable_client.make_call(lead.phone1, lead_data)
+                    
+                    if not call_response["success"]:
+                        logger.error(f"Failed to initiate call for lead {lead.id}: {call_response.get('error')}")
+                        
+                        # Update lead status to CALL_FAILED and log the call
+                        await asyncio.to_thread(
+                            LeadRepository.finalize_call,
+                            lead.id,
+                            LeadStatus.CALL_FAILED,
+                            *_fail_payload(lead, call_response.get("error", "Failed to initiate call"), "failed", datetime.utcnow())
+                        )
+                        
+                        return False
+                    
+                    # Call was initiated successfully
+                    call_id = call_response["call_id"]
+                    self.active_calls[call_id] = lead.id
+                    self.completion_events[call_id] = asyncio.Event()
+                    self._poll_schedule[call_id] = (time.monotonic() + self._poll_base_delay, self._poll_base_delay)
+                    self._poll_wakeup.set()
+                    
+                    # Monitor the call until completion
+                    completed = await self._monitor_call(call_id, lead)
+                    
+                    # Clean up
+                    if call_id in self.active_calls:
+                        del self.active_calls[call_id]
+                    
+                    return completed
+                    
+                except Exception as e:
+                    logger.error(f"Error processing lead {lead.id}: {str(e)}")
+                    
+                    # Update lead status to CALL_FAILED and log the call
+                    await asyncio.to_thread(
+                        LeadRepository.finalize_call,
+                        lead.id,
+                        LeadStatus.CALL_FAILED,
+                        *_fail_payload(lead, str(e), "error", datetime.utcnow())
+                    )
+                    
+                    return False
+        finally:
+            self._inflight_phones.discard(lead.phone1)
     
-    async def _monitor_call(self, call_id: str, lead_id: int) -> bool:
+    async def _monitor_call(self, call_id: str, lead: Lead) -> bool:
         """
         Monitor a call until it completes or times out.
         
@@ -516,62 +971,46 @@ class VoiceAgent:
         -----------
         call_id : str
             The ID of the call to monitor.
-        lead_id : int
-            The ID of the lead being called.
+        lead : Lead
+            The lead being called.
             
         Returns:
         --------
         bool
             True if the call completed successfully, False otherwise.
         """
-        start_time = datetime.utcnow()
-        timeout = start_time + timedelta(seconds=CALL_TIMEOUT_SECONDS)
-        
-        while datetime.utcnow() < timeout:
-            # Check call status
-            status_response = self.assistable_client.get_call_status(call_id)
-            
-            if not status_response["success"]:
-                logger.error(f"Failed to get status for call {call_id}: {status_response.get('error')}")
-                await asyncio.sleep(5)
-                continue
-            
-            status = status_response["status"]
-            logger.info(f"Call {call_id} status: {status}")
-            
-            if status in ["completed", "failed", "no-answer", "busy", "canceled"]:
-                # Call has ended, process the results
-                return await self._process_call_results(call_id, lead_id, status_response)
-            
-            # Wait before checking again
-            await asyncio.sleep(5)
+        # Wait for the status poller, with a single status check as fallback
+        try:
+            await asyncio.wait_for(self.completion_events[call_id].wait(), timeout=CALL_TIMEOUT_SECONDS)
+            payload = self.completion_payloads.pop(call_id)
+            return await self._process_call_results(call_id, lead, {
+                "success": True,
+                "status": payload.get("status"),
+                "details": payload
+            })
+        except asyncio.TimeoutError:
+            status_response = await self.assistable_client.get_call_status(call_id)
+            if status_response["success"] and status_response["status"] in TERMINAL_CALL_STATUSES:
+                return await self._process_call_results(call_id, lead, status_response)
+        finally:
+            self.completion_events.pop(call_id, None)
+            self.completion_payloads.pop(call_id, None)
+            self._poll_schedule.pop(call_id, None)
         
         # Call timed out
         logger.warning(f"Call {call_id} timed out after {CALL_TIMEOUT_SECONDS} seconds")
         
-        # Update lead status to CALL_FAILED
-        LeadRepository.update_lead_status(
-            lead_id, 
+        # Update lead status to CALL_FAILED and log the call
+        await asyncio.to_thread(
+            LeadRepository.finalize_call,
+            lead.id,
             LeadStatus.CALL_FAILED,
-            {
-                "call_completed_at": datetime.utcnow(),
-                "last_error": f"Call timed out after {CALL_TIMEOUT_SECONDS} seconds"
-            }
-        )
-        
-        # Log the call
-        LeadRepository.log_call(
-            lead_id,
-            {
-                "completed_at": datetime.utcnow(),
-                "status": "timeout",
-                "error": f"Call timed out after {CALL_TIMEOUT_SECONDS} seconds"
-            }
+            *_fail_payload(lead, f"Call timed out after {CALL_TIMEOUT_SECONDS} seconds", "timeout", datetime.utcnow())
         )
         
         return False
     
-    async def _process_call_results(self, call_id: str, lead_id: int, status_response: Dict[str, Any]) -> bool:
+    async def _process_call_results(self, call_id: str, lead: Lead, status_response: Dict[str, Any]) -> bool:
         """
         Process the results of a completed call.
         
@@ -579,8 +1018,8 @@ class VoiceAgent:
         -----------
         call_id : str
             The ID of the call.
-        lead_id : int
-            The ID of the lead.
+        lead : Lead
+            The lead that was called.
         status_response : Dict[str, Any]
             Response from the call status check.
             
@@ -589,6 +1028,7 @@ class VoiceAgent:
         bool
             True if the call was successful and the lead was updated, False otherwise.
         """
+        now = datetime.utcnow()
         status = status_response["status"]
         details = status_response.get("details", {})
         call_data = {}
@@ -599,60 +1039,41 @@ class VoiceAgent:
             responses = transcript.get("responses", {})
             
             # Extract confirmed information from responses
-            confirmed_email = None
-            confirmed_address = None
-            confirmed_area_of_interest = None
-            tcpa_accepted = False
-            
-            # Parse through responses to extract confirmed information
-            # This would depend on the actual response format from Assistable.AI
-            # Below is a placeholder implementation
-            for section, response in responses.items():
-                if section == "verify_identity" and response.get("confirmed"):
-                    confirmed_email = response.get("value")
-                
-                elif section == "collect_address":
-                    confirmed_address = response.get("value")
-                
-                elif section == "area_of_interest":
-                    confirmed_area_of_interest = response.get("value")
-                
-                elif section == "tcpa_compliance" and response.get("response") == "yes":
-                    tcpa_accepted = True
-            
-            # Determine if the lead confirmed interest
-            interested = True  # Default to interested unless explicitly not interested
-            for section, response in responses.items():
-                if section in ["verify_education", "area_of_interest"] and response.get("response") == "no":
-                    interested = False
-                    break
+            confirmed = _parse_call_responses(responses)
+            interested = confirmed.pop("interested")
             
             # Download the call recording
-            recording_response = await asyncio.to_thread(
-                self.assistable_client.download_recording, 
-                call_id
-            )
+            recording_response = await self.assistable_client.download_recording(call_id)
             
             if recording_response["success"]:
-                # Upload recording to S3
+                # Upload recording to S3 while the transcript is serialized
                 file_path = recording_response["file_path"]
-                lead = LeadRepository.get_lead_by_id(lead_id)
                 
-                s3_response = await asyncio.to_thread(
-                    s3_manager.upload_recording,
-                    lead.phone1,
-                    file_path,
-                    lead.call_initiated_at or datetime.utcnow()
-                )
+                cancel_upload = threading.Event()
+                try:
+                    s3_response, notes = await asyncio.gather(
+                        asyncio.wrap_future(s3_manager.upload_recording_async(
+                            lead.phone1,
+                            file_path,
+                            lead.call_initiated_at or now,
+                            cancel_upload
+                        )),
+                        asyncio.to_thread(_dumps_notes, responses)
+                    )
+                except asyncio.CancelledError:
+                    # Stop the transfer threads rather than leaving them uploading
+                    cancel_upload.set()
+                    raise
                 
                 if s3_response["success"]:
                     call_data["recording_url"] = s3_response["url"]
                 
-                # Delete the temporary file
-                try:
-                    os.remove(file_path)
-                except Exception as e:
-                    logger.warning(f"Failed to delete temporary recording file: {str(e)}")
+                # Delete the temporary file in the background
+                task = asyncio.create_task(asyncio.to_thread(_remove_recording, file_path))
+                _pending_removals.add(task)
+                task.add_done_callback(_pending_removals.discard)
+            else:
+                notes = _dumps_notes(responses)
             
             # Calculate call duration
             call_duration = None
@@ -663,73 +1084,48 @@ class VoiceAgent:
             
             # Update call data
             call_data.update({
-                "completed_at": datetime.utcnow(),
+                "completed_at": now,
                 "status": "completed",
                 "duration": call_duration,
-                "notes": json.dumps(responses)
+                "notes": notes
             })
             
-            # Log the call
-            LeadRepository.log_call(lead_id, call_data)
-            
-            # Update lead status based on interest
+            # Update lead status based on interest and log the call in one transaction
+            lead_fields = {
+                "call_initiated_at": lead.call_initiated_at,
+                "call_completed_at": now,
+                "call_duration": call_duration,
+                "call_recording_url": call_data.get("recording_url"),
+                "call_notes": notes
+            }
             if interested:
                 # Update lead with confirmed information
-                LeadRepository.update_lead_status(
-                    lead_id, 
-                    LeadStatus.CONFIRMED,
-                    {
-                        "confirmed_email": confirmed_email,
-                        "confirmed_address": confirmed_address,
-                        "confirmed_area_of_interest": confirmed_area_of_interest,
-                        "tcpa_accepted": tcpa_accepted,
-                        "call_completed_at": datetime.utcnow(),
-                        "call_duration": call_duration,
-                        "call_recording_url": call_data.get("recording_url"),
-                        "call_notes": json.dumps(responses)
-                    }
-                )
-                
-                logger.info(f"Lead {lead_id} confirmed and ready for data entry")
-                return True
+                lead_fields.update(confirmed)
+            
+            await asyncio.to_thread(
+                LeadRepository.finalize_call,
+                lead.id,
+                LeadStatus.CONFIRMED if interested else LeadStatus.NOT_INTERESTED,
+                lead_fields,
+                call_data
+            )
+            
+            if interested:
+                logger.info(f"Lead {lead.id} confirmed and ready for data entry")
             else:
-                # Lead is not interested
-                LeadRepository.update_lead_status(
-                    lead_id, 
-                    LeadStatus.NOT_INTERESTED,
-                    {
-                        "call_completed_at": datetime.utcnow(),
-                        "call_duration": call_duration,
-                        "call_recording_url": call_data.get("recording_url"),
-                        "call_notes": json.dumps(responses)
-                    }
-                )
-                
-                logger.info(f"Lead {lead_id} is not interested")
-                return True
+                logger.info(f"Lead {lead.id} is not interested")
+            return True
         
         else:
             # Call failed in some way
-            LeadRepository.update_lead_status(
-                lead_id, 
+            await asyncio.to_thread(
+                LeadRepository.finalize_call,
+                lead.id,
                 LeadStatus.CALL_FAILED,
-                {
-                    "call_completed_at": datetime.utcnow(),
-                    "last_error": f"Call failed with status: {status}"
-                }
-            )
-            
-            # Log the call
-            LeadRepository.log_call(
-                lead_id,
-                {
-                    "completed_at": datetime.utcnow(),
-                    "status": status,
-                    "error": f"Call failed with status: {status}"
-                }
+                *_fail_payload(lead, f"Call failed with status: {status}", status, now)
             )
             
-            logger.warning(f"Call {call_id} for lead {lead_id} failed with status: {status}")
+            logger.warning(f"Call {call_id} for lead {lead.id} failed with status: {status}")
             return False
 
 
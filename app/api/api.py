@@ -1,28 +1,59 @@
 import os
 import sys
-from pathlib import Path
+import time
+import hmac
+import hashlib
+import shutil
+import tempfile
+import orjson
+from pathlib import Path, PurePath, PureWindowsPath
 import asyncio
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+from contextlib import asynccontextmanager
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 
-from fastapi import FastAPI, BackgroundTasks, HTTPException, Depends, File, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Depends, File, UploadFile, Request, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter, field_validator
 
 from app.database.repository import LeadRepository
 from app.database.models import LeadStatus
+from app.database.session import warm_up_pool
 from app.utils.csv_processor import CSVProcessor
-from app.config.settings import APP_NAME, APP_VERSION, CSV_IMPORT_DIRECTORY
+from app.agents.voice_agent import dispatch_call_event
+from app.config.settings import APP_NAME, APP_VERSION, CSV_IMPORT_DIRECTORY, API_WORKERS, ASSISTABLE_WEBHOOK_SECRET
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Open the database connection pool before serving the first request.
+    """
+    await asyncio.to_thread(warm_up_pool)
+    yield
+
+
+# Chunk size used when copying uploaded files to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Suffix added to an uploaded file name that is already taken
+UPLOAD_TIMESTAMP_FORMAT = "%Y%m%d%H%M%S"
+
+# Uploaded CSVs are written here; created once at import rather than per upload
+_IMPORT_DIR = Path(CSV_IMPORT_DIRECTORY)
+_IMPORT_DIR.mkdir(parents=True, exist_ok=True)
+
 
 # Create FastAPI app
 app = FastAPI(
     title=f"{APP_NAME} API",
     description="API for the Multi-Agent Lead Processing System",
-    version=APP_VERSION
+    version=APP_VERSION,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -32,6 +63,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the pagination cursor of GET /leads and the
+    # ETag of GET /leads/{lead_id}, for conditional requests
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 
@@ -54,12 +88,115 @@ class LeadCreate(LeadBase):
     
 
 class LeadResponse(LeadBase):
+    model_config = ConfigDict(from_attributes=True, defer_build=False)
+    
     id: int
     status: str
     created_at: datetime
     
-    class Config:
-        orm_mode = True
+    @field_validator("status", mode="before")
+    @classmethod
+    def _status_value(cls, value: Any) -> Any:
+        return value.value if isinstance(value, LeadStatus) else value
+
+
+# ----- Helpers -----
+
+_LEAD_LIST_ADAPTER = TypeAdapter(List[LeadResponse])
+
+# Lead statuses by upper- and lower-case name
+_STATUS_BY_NAME = {
+    **{s.name: s for s in LeadStatus},
+    **{s.name.lower(): s for s in LeadStatus}
+}
+
+
+def require_status(status: str) -> LeadStatus:
+    """
+    Dependency resolving the required "status" parameter to a LeadStatus.
+    
+    Names are matched case-insensitively; unknown names are rejected with 400.
+    
+    Parameters:
+    -----------
+    status : str
+        The status name.
+        
+    Returns:
+    --------
+    LeadStatus
+        The matching status.
+    """
+    lead_status = _STATUS_BY_NAME.get(status) or _STATUS_BY_NAME.get(status.lower())
+    if lead_status is None:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+    return lead_status
+
+
+def parse_status(status: Optional[str] = None) -> Optional[LeadStatus]:
+    """
+    Dependency resolving the optional "status" parameter to a LeadStatus.
+    
+    Parameters:
+    -----------
+    status : Optional[str]
+        The status name, if given.
+        
+    Returns:
+    --------
+    Optional[LeadStatus]
+        The matching status, or None if no status was given.
+    """
+    return require_status(status) if status else None
+
+
+def _lead_etag(lead) -> Optional[str]:
+    """
+    Build a weak ETag for a lead from its ID and last update time.
+    
+    Parameters:
+    -----------
+    lead : Lead
+        The lead.
+        
+    Returns:
+    --------
+    Optional[str]
+        The ETag, or None if the lead has no update time.
+    """
+    if lead.updated_at is None:
+        return None
+    return f'W/"{lead.id}-{int(lead.updated_at.timestamp() * 1_000_000)}"'
+
+
+# (second, ISO timestamp, "/" payload) for the current second
+_last_ts = (0, "", b"")
+
+
+def _current_timestamp() -> tuple:
+    """
+    Get the second-resolution UTC timestamp and "/" payload for this second.
+    
+    Both are rebuilt at most once per second; the tuple is replaced in a single
+    assignment so concurrent readers never see a mix of two seconds.
+    
+    Returns:
+    --------
+    tuple
+        The ISO timestamp string and the encoded "/" response body.
+    """
+    global _last_ts
+    now = int(time.time())
+    cached = _last_ts
+    if cached[0] != now:
+        timestamp = datetime.utcfromtimestamp(now).isoformat()
+        payload = orjson.dumps({
+            "application": APP_NAME,
+            "version": APP_VERSION,
+            "timestamp": timestamp
+        })
+        cached = _last_ts = (now, timestamp, payload)
+    return cached[1], cached[2]
 
 
 # ----- Routes -----
@@ -67,79 +204,60 @@ class LeadResponse(LeadBase):
 @app.get("/", tags=["General"])
 async def root():
     """Get basic API information"""
-    return {
-        "application": APP_NAME,
-        "version": APP_VERSION,
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    return Response(content=_current_timestamp()[1], media_type="application/json")
 
 
 @app.get("/status", tags=["General"])
-async def get_status():
+def get_status():
     """Get system status and statistics"""
     stats = LeadRepository.get_lead_statistics()
     return {
         "status": "running",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _current_timestamp()[0],
         "statistics": stats
     }
 
 
 @app.get("/leads", tags=["Leads"], response_model=List[LeadResponse])
-async def get_leads(status: Optional[str] = None, limit: int = 100, offset: int = 0):
+def get_leads(lead_status: Optional[LeadStatus] = Depends(parse_status),
+              after_id: Optional[int] = None, limit: int = 100):
     """
-    Get a list of leads, optionally filtered by status.
+    Get a page of leads in ID order, optionally filtered by status.
+    
+    The ID of the last lead on the page is returned in the X-Next-Cursor
+    header; pass it as after_id to get the next page.
     
     Parameters:
     -----------
     status : Optional[str]
         Filter by lead status. If None, get all leads.
+    after_id : Optional[int]
+        Return leads after this lead ID (the previous page's cursor). Default is None.
     limit : int
         Maximum number of leads to return. Default is 100.
-    offset : int
-        Offset for pagination. Default is 0.
     """
     try:
-        if status:
-            try:
-                lead_status = LeadStatus[status.upper()]
-                leads = LeadRepository.get_leads_by_status(lead_status, limit=limit)
-            except KeyError:
-                raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
-        else:
-            # Get all leads (this would need to be implemented)
-            # Simplified implementation for demonstration
-            leads = []
-            
-            for status_enum in LeadStatus:
-                leads.extend(LeadRepository.get_leads_by_status(status_enum, limit=limit//len(LeadStatus)))
+        leads = LeadRepository.get_leads_by_status_after(lead_status, after_id=after_id, limit=limit)
         
-        # Convert to response model
-        return [
-            LeadResponse(
-                id=lead.id,
-                firstname=lead.firstname,
-                lastname=lead.lastname,
-                email=lead.email,
-                phone1=lead.phone1,
-                address=lead.address,
-                city=lead.city,
-                state=lead.state,
-                zip=lead.zip,
-                status=lead.status.value,
-                created_at=lead.created_at
-            )
-            for lead in leads
-        ]
+        # Validate and serialize the page in one pass each; returning the
+        # bytes directly skips FastAPI's second validation of response_model
+        body = _LEAD_LIST_ADAPTER.dump_json(_LEAD_LIST_ADAPTER.validate_python(leads))
+        headers = {"X-Next-Cursor": str(leads[-1].id)} if leads else None
+        return Response(content=body, media_type="application/json", headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/leads/{lead_id}", tags=["Leads"], response_model=LeadResponse)
-async def get_lead(lead_id: int):
+def get_lead(lead_id: int, request: Request, response: Response):
     """
     Get a lead by ID.
     
+    The response carries an ETag; a request whose If-None-Match header matches
+    it gets an empty 304 Not Modified instead of the lead.
+    
     Parameters:
     -----------
     lead_id : int
@@ -151,19 +269,14 @@ async def get_lead(lead_id: int):
         if not lead:
             raise HTTPException(status_code=404, detail=f"Lead {lead_id} not found")
         
-        return LeadResponse(
-            id=lead.id,
-            firstname=lead.firstname,
-            lastname=lead.lastname,
-            email=lead.email,
-            phone1=lead.phone1,
-            address=lead.address,
-            city=lead.city,
-            state=lead.state,
-            zip=lead.zip,
-            status=lead.status.value,
-            created_at=lead.created_at
-        )
+        etag = _lead_etag(lead)
+        if etag:
+            if_none_match = request.headers.get("if-none-match", "")
+            if etag in (tag.strip() for tag in if_none_match.split(",")):
+                return Response(status_code=304, headers={"ETag": etag})
+            response.headers["ETag"] = etag
+        
+        return LeadResponse.model_validate(lead)
     except HTTPException:
         raise
     except Exception as e:
@@ -171,7 +284,7 @@ async def get_lead(lead_id: int):
 
 
 @app.post("/leads", tags=["Leads"], response_model=LeadResponse)
-async def create_lead(lead: LeadCreate):
+def create_lead(lead: LeadCreate):
     """
     Create a new lead.
     
@@ -196,25 +309,13 @@ async def create_lead(lead: LeadCreate):
         # Retrieve the created lead
         created_lead = LeadRepository.get_lead_by_id(lead_id)
         
-        return LeadResponse(
-            id=created_lead.id,
-            firstname=created_lead.firstname,
-            lastname=created_lead.lastname,
-            email=created_lead.email,
-            phone1=created_lead.phone1,
-            address=created_lead.address,
-            city=created_lead.city,
-            state=created_lead.state,
-            zip=created_lead.zip,
-            status=created_lead.status.value,
-            created_at=created_lead.created_at
-        )
+        return LeadResponse.model_validate(created_lead)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.put("/leads/{lead_id}/status", tags=["Leads"])
-async def update_lead_status(lead_id: int, status: str):
+def update_lead_status(lead_id: int, lead_status: LeadStatus = Depends(require_status)):
     """
     Update the status of a lead.
     
@@ -226,27 +327,57 @@ async def update_lead_status(lead_id: int, status: str):
         The new status for the lead.
     """
     try:
-        # Validate status
-        try:
-            lead_status = LeadStatus[status.upper()]
-        except KeyError:
-            raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
-        
         # Update the lead status
         success = LeadRepository.update_lead_status(lead_id, lead_status)
         
         if not success:
             raise HTTPException(status_code=404, detail=f"Lead {lead_id} not found")
         
-        return {"status": "success", "message": f"Lead {lead_id} status updated to {status}"}
+        return {"status": "success", "message": f"Lead {lead_id} status updated to {lead_status.value}"}
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/calls/events", tags=["Calls"])
+async def call_events(request: Request):
+    """
+    Webhook for Assistable.AI call events (configured via ASSISTABLE_CALLBACK_URL).
+    
+    The request must be signed with ASSISTABLE_WEBHOOK_SECRET: the
+    X-Assistable-Signature header carries the hex HMAC-SHA256 of the body.
+    An event only makes the voice agent check the call's status with
+    Assistable.AI; nothing in it is written to the database.
+    
+    Parameters:
+    -----------
+    request : Request
+        The call event, a JSON object including "call_id".
+    """
+    if not ASSISTABLE_WEBHOOK_SECRET:
+        raise HTTPException(status_code=503, detail="Call event webhook is not configured")
+    
+    body = await request.body()
+    expected = hmac.new(ASSISTABLE_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, request.headers.get("X-Assistable-Signature", "")):
+        raise HTTPException(status_code=401, detail="Invalid signature")
+    
+    try:
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+    
+    call_id = payload.get("call_id") if isinstance(payload, dict) else None
+    if not call_id or not isinstance(call_id, str):
+        raise HTTPException(status_code=400, detail="Missing call_id")
+    
+    delivered = dispatch_call_event(call_id)
+    return {"status": "success", "delivered": delivered}
+
+
 @app.post("/csv/upload", tags=["CSV"])
-async def upload_csv(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+def upload_csv(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """
     Upload a CSV file for processing.
     
@@ -256,23 +387,33 @@ async def upload_csv(background_tasks: BackgroundTasks, file: UploadFile = File(
         The CSV file to upload.
     """
     try:
+        # Drop any directory components (either separator) so the upload can't
+        # be written outside the import directory
+        safe_name = PureWindowsPath(file.filename or "").name
+        
         # Validate file type
-        if not file.filename.endswith('.csv'):
+        if PurePath(safe_name).suffix.lower() != ".csv":
             raise HTTPException(status_code=400, detail="File must be a CSV")
         
         # Create destination path
-        os.makedirs(CSV_IMPORT_DIRECTORY, exist_ok=True)
-        destination = os.path.join(CSV_IMPORT_DIRECTORY, file.filename)
+        destination = _IMPORT_DIR / safe_name
         
         # Check if file already exists
-        if os.path.exists(destination):
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            filename, ext = os.path.splitext(file.filename)
-            destination = os.path.join(CSV_IMPORT_DIRECTORY, f"{filename}_{timestamp}{ext}")
+        if destination.exists():
+            timestamp = datetime.now().strftime(UPLOAD_TIMESTAMP_FORMAT)
+            destination = _IMPORT_DIR / f"{destination.stem}_{timestamp}{destination.suffix}"
+        destination = str(destination)
         
-        # Write the file
-        with open(destination, "wb") as buffer:
-            buffer.write(await file.read())
+        # Stream the upload to a temporary file next to the destination, then move
+        # it into place so the importer never sees a partially written CSV
+        with tempfile.NamedTemporaryFile("wb", dir=_IMPORT_DIR, suffix=".part", delete=False) as buffer:
+            try:
+                shutil.copyfileobj(file.file, buffer, UPLOAD_CHUNK_SIZE)
+            except Exception:
+                buffer.close()
+                os.remove(buffer.name)
+                raise
+        os.replace(buffer.name, destination)
         
         # Process the file in the background
         def process_csv():
@@ -282,7 +423,7 @@ async def upload_csv(background_tasks: BackgroundTasks, file: UploadFile = File(
         
         return {
             "status": "success", 
-            "message": f"File {file.filename} uploaded successfully and scheduled for processing",
+            "message": f"File {safe_name} uploaded successfully and scheduled for processing",
             "file_path": destination
         }
     except HTTPException:
@@ -314,20 +455,57 @@ async def process_csv_files(background_tasks: BackgroundTasks):
 
 
 # Run the API server
-def start_api_server(host: str = "0.0.0.0", port: int = 8000):
+def start_api_server(host: str = "0.0.0.0", port: int = 8000, workers: int = 1):
     """
     Start the API server.
     
+    uvicorn picks the uvloop event loop and the httptools parser when they are
+    installed (uvicorn[standard]).
+    
     Parameters:
     -----------
     host : str
         The host to listen on. Default is "0.0.0.0".
     port : int
         The port to listen on. Default is 8000.
+    workers : int
+        Number of worker processes. Default is 1. Use 1 when the API runs in
+        the same process as the agents, since call event webhooks are
+        delivered to the in-process Voice Agent.
     """
     import uvicorn
-    uvicorn.run(app, host=host, port=port)
+    if workers > 1:
+        # Worker processes import the app themselves
+        uvicorn.run("app.api.api:app", host=host, port=port, workers=workers, proxy_headers=True)
+    else:
+        uvicorn.run(app, host=host, port=port, proxy_headers=True)
+
+
 
+def create_api_server(host: str = "0.0.0.0", port: int = 8000):
+    """
+    Create an API server to run on the caller's event loop.
+    
+    Await ``serve()`` on the returned server alongside the agents, and set its
+    ``should_exit`` to shut it down. Signal handling is left to the host
+    application.
+    
+    Parameters:
+    -----------
+    host : str
+        The host to listen on. Default is "0.0.0.0".
+    port : int
+        The port to listen on. Default is 8000.
+        
+    Returns:
+    --------
+    uvicorn.Server
+        The server, not yet started.
+    """
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, proxy_headers=True))
+    server.install_signal_handlers = lambda: None
+    return server
 
 if __name__ == "__main__":
     # Parse command line arguments
@@ -335,7 +513,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="API Server for Multi-Agent Lead Processing System")
     parser.add_argument("--host", type=str, default="0.0.0.0", help="Host to listen on")
     parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="Number of worker processes")
     args = parser.parse_args()
     
     # Start the API server
-    start_api_server(host=args.host, port=args.port) 
\ No newline at end of file
+    start_api_server(host=args.host, port=args.port, workers=args.workers) 
\ No newline at end of file
@@ -27,12 +27,26 @@ LOG_LEVEL = "INFO"
 # Path Configuration
 CSV_IMPORT_DIRECTORY = os.path.join(BASE_DIR, "data", "import")
 
+# API Server Configuration
+# Worker processes for the API server when it runs on its own (--api-only).
+# When it shares a process with the agents it always runs a single worker.
+# Each worker has its own database pool (warmed up to DB_POOL_SIZE = 20
+# connections at startup, up to 30 under load), so the default stays small:
+# the workers plus the agents must fit in PostgreSQL's max_connections (100
+# by default)
+API_WORKERS = int(os.getenv("WEB_CONCURRENCY") or 2)
+
 # Database Configuration
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = int(os.getenv("DB_PORT", "5432"))
-DB_NAME = os.getenv("DB_NAME", "multiagent_db")
+DB_NAME = os.getenv("DB_NAME", "lead_processing")
 DB_USER = os.getenv("DB_USER", "postgres")
-DB_PASSWORD = os.getenv("DB_PASSWORD", "123")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "")
+# A full DATABASE_URL (as set by docker-compose) takes precedence over the DB_* parts
+DATABASE_URL = os.getenv("DATABASE_URL") or f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Test each pooled connection with a round trip on checkout. Off by default: TCP
+# keepalives and pool recycling already retire dead connections
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
 
 # AWS S3 Configuration
 AWS_ACCESS_KEY = os.getenv("AWS_ACCESS_KEY", "AWS_ACCESS_KEY")
@@ -46,11 +60,20 @@ PUBLISHER_ID = os.getenv("PUBLISHER_ID", "142")
 ASSISTABLE_API_KEY = os.getenv("ASSISTABLE_API_KEY", "ASSISTABLE_API_KEY")
 ASSISTABLE_BASE_URL = os.getenv("ASSISTABLE_BASE_URL", "https://api.assistable.ai")
 ASSISTABLE_API_URL = ASSISTABLE_BASE_URL
+# Public URL of the API's POST /calls/events route. When set, call events make
+# the voice agent check a call's status right away, and the status poller only
+# runs as a slow fallback.
+ASSISTABLE_CALLBACK_URL = os.getenv("ASSISTABLE_CALLBACK_URL") or None
+# Shared secret for call event webhooks: requests must carry the hex HMAC-SHA256
+# of their body in X-Assistable-Signature. Webhooks are rejected while unset.
+ASSISTABLE_WEBHOOK_SECRET = os.getenv("ASSISTABLE_WEBHOOK_SECRET") or None
 
 # LeadHoop Configuration
 LEADHOOP_PORTAL_URL = os.getenv("LEADHOOP_PORTAL_URL", "https://ieim-portal")
 LEADHOOP_USERNAME = os.getenv("LEADHOOP_USERNAME", "LEADHOOP_USERNAME")
 LEADHOOP_PASSWORD = os.getenv("LEADHOOP_PASSWORD", "LEADHOOP_PASSWORD")
+# Where the authenticated portal session (cookies + local storage) is saved
+LEADHOOP_STATE_PATH = os.getenv("LEADHOOP_STATE_PATH", os.path.join(BASE_DIR, "data", "leadhoop_state.json"))
 
 # Voice Agent Configuration
 MAX_CONCURRENT_CALLS = 5
@@ -61,4 +84,10 @@ TCPA_COMPLIANCE_TEXT = "This call is being recorded for quality assurance purpos
 # Data Entry Agent Configuration
 MAX_CONCURRENT_DATA_ENTRIES = 3
 ENTRY_RETRY_ATTEMPTS = 3
-ENTRY_TIMEOUT_SECONDS = 300 
\ No newline at end of file
+ENTRY_TIMEOUT_SECONDS = 300
+# Connect to an already running Chromium over CDP (e.g. "http://localhost:9222")
+# instead of launching one per agent process
+BROWSER_CDP_ENDPOINT = os.getenv("BROWSER_CDP_ENDPOINT") or None
+SCREENSHOT_DIRECTORY = os.path.join(BASE_DIR, "logs", "screenshots")
+# Failure screenshots are always captured; success ones only when enabled
+CAPTURE_SUCCESS_SCREENSHOTS = os.getenv("CAPTURE_SUCCESS_SCREENSHOTS", "false").lower() == "true" 
\ No newline at end of file
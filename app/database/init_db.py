@@ -7,12 +7,10 @@ sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 
 from app.database.models import Base
 from app.database.session import engine
+from sqlalchemy import text
 from loguru import logger
-from dotenv import load_dotenv
 import argparse
 
-load_dotenv()
-
 
 def init_db(drop_all=False):
     """
@@ -25,14 +23,18 @@ def init_db(drop_all=False):
         Default is False.
     """
     try:
-        if drop_all:
-            logger.info("Dropping all tables...")
-            Base.metadata.drop_all(engine)
-            logger.info("All tables dropped successfully.")
-        
-        logger.info("Creating database tables...")
-        Base.metadata.create_all(engine)
-        logger.info("Database tables created successfully.")
+        with engine.begin() as connection:
+            # Schema changes may run longer than the pool's statement timeout
+            connection.execute(text("SET LOCAL statement_timeout = 0"))
+            
+            if drop_all:
+                logger.info("Dropping all tables...")
+                Base.metadata.drop_all(connection)
+                logger.info("All tables dropped successfully.")
+            
+            logger.info("Creating database tables...")
+            Base.metadata.create_all(connection)
+            logger.info("Database tables created successfully.")
         
         return True
     except Exception as e:
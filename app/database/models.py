@@ -1,11 +1,7 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, Enum, ForeignKey, create_engine
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, Enum, ForeignKey, Index, text
 from sqlalchemy.orm import declarative_base, relationship
 import enum
 from datetime import datetime, timezone
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
 Base = declarative_base()
 
@@ -22,13 +18,25 @@ class LeadStatus(enum.Enum):
 
 class Lead(Base):
     __tablename__ = "leads"
+    __table_args__ = (
+        # Keyset pagination by status: status = :s AND id > :after_id ORDER BY id
+        # (also serves plain status filters, so status needs no index of its own)
+        Index("ix_leads_status_id", "status", "id"),
+        # Work queues, kept small by covering only the rows still to be processed
+        # (LeadRepository.claim_leads_for_calling / get_confirmed_leads_for_entry);
+        # the enum is stored by name
+        Index("ix_leads_pending_queue", "created_at",
+              postgresql_where=text("status = 'PENDING' AND call_attempts < 3")),
+        Index("ix_leads_confirmed_entry", "status_updated_at",
+              postgresql_where=text("status = 'CONFIRMED' AND entry_attempts < 3")),
+    )
 
     id = Column(Integer, primary_key=True)
     
     # Basic information from CSV
     firstname = Column(String(100))
     lastname = Column(String(100))
-    email = Column(String(255))
+    email = Column(String(255), index=True)
     phone1 = Column(String(20))
     address = Column(String(255))
     address2 = Column(String(255), nullable=True)
@@ -132,17 +140,3 @@ class EntryLog(Base):
     def __repr__(self):
         return f"<EntryLog {self.id} for Lead {self.lead_id}: {self.status}>"
 
-
-# Create database connection
-def get_db_url():
-    host = os.getenv("DB_HOST", "localhost")
-    port = os.getenv("DB_PORT", "5432")
-    database = os.getenv("DB_NAME", "lead_processing")
-    user = os.getenv("DB_USER", "postgres")
-    password = os.getenv("DB_PASSWORD", "")
-    
-    return f"postgresql://{user}:{password}@{host}:{port}/{database}"
-
-
-# For direct DB operations when needed
-engine = create_engine(get_db_url()) 
\ No newline at end of file
@@ -1,12 +1,73 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+import time
+import threading
+from sqlalchemy.orm import Session, defer, raiseload
+from sqlalchemy import and_, func, insert, literal, null, select, text, union_all, update
+from sqlalchemy.engine import Row
+from datetime import datetime
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 
 from app.database.models import Lead, LeadStatus, CallLog, EntryLog
 from app.database.session import get_db_session
 from loguru import logger
 
+# Rows per INSERT statement batch in bulk_create_leads
+BULK_INSERT_CHUNK_SIZE = 1000
+
+# Lead columns returned by list queries (those shown in lead listings)
+LEAD_SUMMARY_COLUMNS = (
+    Lead.id, Lead.firstname, Lead.lastname, Lead.email, Lead.phone1, Lead.address,
+    Lead.city, Lead.state, Lead.zip, Lead.status, Lead.created_at
+)
+
+# Loader options for leads handed to the agents: skip the free-text columns they
+# never read and raise on any relationship access instead of lazy loading. The
+# leads are returned detached, so reading call_notes, entry_notes or last_error
+# on them raises DetachedInstanceError (the agents only write those columns,
+# through update_lead_status / finalize_*)
+AGENT_LEAD_OPTIONS = (
+    defer(Lead.call_notes),
+    defer(Lead.entry_notes),
+    defer(Lead.last_error),
+    raiseload("*"),
+)
+
+# Lead statistics are reused for this many seconds (see get_lead_statistics)
+STATS_CACHE_TTL_SECONDS = 5
+_stats_cache = {"value": None, "expires_at": 0.0}
+_stats_lock = threading.Lock()
+
+# Lead column names accepted in additional_fields of status updates
+_LEAD_UPDATABLE_COLUMNS = frozenset(Lead.__table__.columns.keys()) - {"id", "created_at"}
+
+
+def _status_update(lead_id: int, status: LeadStatus, additional_fields: Optional[Dict[str, Any]]):
+    """
+    Build the UPDATE setting a lead's status and any additional column values.
+    
+    Keys of additional_fields that are not updatable Lead columns (including id
+    and created_at) are ignored.
+    
+    Parameters:
+    -----------
+    lead_id : int
+        The ID of the lead to update.
+    status : LeadStatus
+        The new status for the lead.
+    additional_fields : Optional[Dict[str, Any]]
+        Additional fields to update.
+        
+    Returns:
+    --------
+    Update
+        The UPDATE statement.
+    """
+    fields = additional_fields or {}
+    values = {key: fields[key] for key in fields.keys() & _LEAD_UPDATABLE_COLUMNS}
+    values["status"] = status
+    values["status_updated_at"] = datetime.utcnow()
+    return update(Lead).where(Lead.id == lead_id).values(values)
+
 
 class LeadRepository:
     """
@@ -29,32 +90,13 @@ class LeadRepository:
             The lead object if found, None otherwise.
         """
         with get_db_session() as session:
-            # Use joinedload to eagerly load all relationships to avoid detached instance issues
-            lead = session.query(Lead).filter(Lead.id == lead_id).first()
+            # Identity map first, then a cached primary key SELECT
+            lead = session.get(Lead, lead_id, options=[raiseload("*")])
             
             if lead:
-                # Ensure all attributes are loaded before session closes
-                session.refresh(lead)
-                
-                # Make a detached copy with all attributes loaded
-                lead_copy = Lead(
-                    id=lead.id,
-                    firstname=lead.firstname,
-                    lastname=lead.lastname,
-                    email=lead.email,
-                    phone1=lead.phone1,
-                    address=lead.address,
-                    address2=lead.address2,
-                    city=lead.city,
-                    state=lead.state,
-                    zip=lead.zip,
-                    status=lead.status,
-                    created_at=lead.created_at,
-                    updated_at=lead.updated_at,
-                    # Add other fields as needed
-                )
-                return lead_copy
-            return None
+                # Detach before the commit so the returned lead is not expired
+                session.expunge(lead)
+            return lead
     
     @staticmethod
     def get_leads_by_status(status: LeadStatus, limit: int = 100) -> List[Lead]:
@@ -71,40 +113,133 @@ class LeadRepository:
         Returns:
         --------
         List[Lead]
-            A list of leads with the specified status.
+            A list of leads with the specified status (detached, without
+            call_notes, entry_notes and last_error; see AGENT_LEAD_OPTIONS).
         """
         with get_db_session() as session:
-            return session.query(Lead).filter(Lead.status == status).limit(limit).all()
+            leads = session.scalars(
+                select(Lead).where(Lead.status == status).limit(limit).options(*AGENT_LEAD_OPTIONS)
+            ).all()
+            
+            # Detach before the commit so the returned leads are not expired
+            session.expunge_all()
+            return leads
     
     @staticmethod
-    def get_pending_leads_for_calling(limit: int = 10) -> List[Lead]:
+    def get_leads_by_status_after(status: Optional[LeadStatus] = None, after_id: Optional[int] = None,
+                                  limit: int = 100) -> List[Row]:
         """
-        Get pending leads that are ready to be called.
+        Get a page of lead summaries in ID order, starting after a given lead ID.
+        
+        Uses keyset pagination (WHERE id > after_id ORDER BY id), so the cost of
+        a page does not grow with its depth the way OFFSET does. Only the
+        LEAD_SUMMARY_COLUMNS are selected, as plain rows rather than ORM objects.
         
         Parameters:
         -----------
+        status : Optional[LeadStatus], optional
+            The status to filter leads by. If None, leads of all statuses are returned.
+        after_id : Optional[int], optional
+            Return only leads with an ID greater than this (the last ID of the
+            previous page). If None, start from the first lead.
         limit : int, optional
-            The maximum number of leads to return. Default is 10.
+            The maximum number of leads to return. Default is 100.
             
         Returns:
         --------
-        List[Lead]
-            A list of pending leads ready for calling.
+        List[Row]
+            Rows with the summary columns as attributes, ordered by ID.
         """
         with get_db_session() as session:
-            # Get leads that are in PENDING status and haven't been called yet or haven't been called in the last hour
-            one_hour_ago = datetime.utcnow() - timedelta(hours=1)
+            query = select(*LEAD_SUMMARY_COLUMNS)
+            if status is not None:
+                query = query.where(Lead.status == status)
+            if after_id is not None:
+                query = query.where(Lead.id > after_id)
+            return session.execute(query.order_by(Lead.id).limit(limit)).all()
+    
+    @staticmethod
+    def claim_leads_for_calling(limit: int = 10) -> List[Lead]:
+        """
+        Claim pending leads for calling.
+        
+        The oldest pending leads are locked with FOR UPDATE SKIP LOCKED and moved
+        to CALLING in the same transaction, with call_attempts incremented, so
+        concurrent callers never claim the same lead. call_initiated_at is left
+        for the caller to record when the call is actually placed; leads that
+        end up not being called go back with release_claimed_leads.
+        
+        Parameters:
+        -----------
+        limit : int, optional
+            The maximum number of leads to claim. Default is 10.
             
-            return session.query(Lead).filter(
-                and_(
+        Returns:
+        --------
+        List[Lead]
+            The claimed leads (detached), oldest first. call_notes, entry_notes
+            and last_error are not loaded (see AGENT_LEAD_OPTIONS).
+        """
+        with get_db_session() as session:
+            lead_ids = session.scalars(
+                select(Lead.id).where(
                     Lead.status == LeadStatus.PENDING,
-                    or_(
-                        Lead.call_initiated_at == None,
-                        Lead.call_initiated_at < one_hour_ago
-                    ),
                     Lead.call_attempts < 3  # Limit attempts
-                )
-            ).order_by(Lead.created_at).limit(limit).all()
+                ).order_by(Lead.created_at).limit(limit).with_for_update(skip_locked=True)
+            ).all()
+            
+            if not lead_ids:
+                return []
+            
+            now = datetime.utcnow()
+            leads = session.scalars(
+                update(Lead).where(Lead.id.in_(lead_ids)).values(
+                    status=LeadStatus.CALLING,
+                    status_updated_at=now,
+                    call_attempts=Lead.call_attempts + 1
+                ).returning(Lead).options(*AGENT_LEAD_OPTIONS)
+            ).all()
+            
+            # Detach before the commit so the returned leads are not expired
+            session.expunge_all()
+            return sorted(leads, key=lambda lead: lead.created_at)
+    
+    @staticmethod
+    def release_claimed_leads(lead_ids: List[int]) -> int:
+        """
+        Return claimed leads that were never called to PENDING.
+        
+        Undoes claim_leads_for_calling for leads still in CALLING: the status
+        goes back to PENDING and the call attempt is not counted.
+        
+        Parameters:
+        -----------
+        lead_ids : List[int]
+            The IDs of the claimed leads.
+            
+        Returns:
+        --------
+        int
+            The number of leads released.
+        """
+        if not lead_ids:
+            return 0
+        
+        try:
+            with get_db_session() as session:
+                return session.execute(
+                    update(Lead).where(
+                        Lead.id.in_(lead_ids),
+                        Lead.status == LeadStatus.CALLING
+                    ).values(
+                        status=LeadStatus.PENDING,
+                        status_updated_at=datetime.utcnow(),
+                        call_attempts=Lead.call_attempts - 1
+                    ).execution_options(synchronize_session=False)
+                ).rowcount
+        except Exception as e:
+            logger.error(f"Error releasing claimed leads: {str(e)}")
+            return 0
     
     @staticmethod
     def get_confirmed_leads_for_entry(limit: int = 10) -> List[Lead]:
@@ -119,16 +254,21 @@ class LeadRepository:
         Returns:
         --------
         List[Lead]
-            A list of confirmed leads ready for data entry.
+            A list of confirmed leads ready for data entry (detached, without
+            call_notes, entry_notes and last_error; see AGENT_LEAD_OPTIONS).
         """
         with get_db_session() as session:
             # Get leads that are in CONFIRMED status
-            return session.query(Lead).filter(
+            leads = session.scalars(select(Lead).where(
                 and_(
                     Lead.status == LeadStatus.CONFIRMED,
                     Lead.entry_attempts < 3  # Limit attempts
                 )
-            ).order_by(Lead.status_updated_at).limit(limit).all()
+            ).order_by(Lead.status_updated_at).limit(limit).options(*AGENT_LEAD_OPTIONS)).all()
+            
+            # Detach before the commit so the returned leads are not expired
+            session.expunge_all()
+            return leads
     
     @staticmethod
     def update_lead_status(lead_id: int, status: LeadStatus, additional_fields: Dict[str, Any] = None) -> bool:
@@ -151,26 +291,141 @@ class LeadRepository:
         """
         try:
             with get_db_session() as session:
-                lead = session.query(Lead).filter(Lead.id == lead_id).first()
+                result = session.execute(_status_update(lead_id, status, additional_fields))
                 
-                if not lead:
+                if result.rowcount == 0:
                     logger.error(f"Lead with ID {lead_id} not found for status update.")
                     return False
                 
-                lead.status = status
-                lead.status_updated_at = datetime.utcnow()
-                
-                if additional_fields:
-                    for key, value in additional_fields.items():
-                        if hasattr(lead, key):
-                            setattr(lead, key, value)
-                
-                session.commit()
                 return True
         except Exception as e:
             logger.error(f"Error updating lead status: {str(e)}")
             return False
     
+    @staticmethod
+    def bulk_mark_in_progress(lead_ids: List[int]) -> int:
+        """
+        Mark a batch of leads as ENTRY_IN_PROGRESS with a single UPDATE.
+        
+        Parameters:
+        -----------
+        lead_ids : List[int]
+            The IDs of the leads about to be entered.
+            
+        Returns:
+        --------
+        int
+            The number of leads updated.
+        """
+        if not lead_ids:
+            return 0
+        
+        try:
+            with get_db_session() as session:
+                now = datetime.utcnow()
+                return session.query(Lead).filter(Lead.id.in_(lead_ids)).update(
+                    {
+                        Lead.status: LeadStatus.ENTRY_IN_PROGRESS,
+                        Lead.status_updated_at: now,
+                        Lead.entry_initiated_at: now,
+                        Lead.entry_attempts: Lead.entry_attempts + 1
+                    },
+                    synchronize_session=False
+                )
+        except Exception as e:
+            logger.error(f"Error marking leads as in progress: {str(e)}")
+            return 0
+    
+    @staticmethod
+    def _finalize(lead_id: int, status: LeadStatus, additional_fields: Dict[str, Any],
+                  log_model, log_data: Dict[str, Any]) -> bool:
+        """
+        Update a lead's status and insert a log row for it in one transaction.
+        
+        Parameters:
+        -----------
+        lead_id : int
+            The ID of the lead to update.
+        status : LeadStatus
+            The new status for the lead.
+        additional_fields : Dict[str, Any]
+            Additional lead fields to update.
+        log_model : type
+            The log model to insert (CallLog or EntryLog).
+        log_data : Dict[str, Any]
+            Data for the log row.
+            
+        Returns:
+        --------
+        bool
+            True if the update was successful, False otherwise.
+        """
+        with get_db_session() as session:
+            result = session.execute(_status_update(lead_id, status, additional_fields))
+            
+            if result.rowcount == 0:
+                logger.error(f"Lead with ID {lead_id} not found for status update.")
+                return False
+            
+            session.add(log_model(lead_id=lead_id, **log_data))
+            return True
+    
+    @staticmethod
+    def finalize_entry(lead_id: int, status: LeadStatus, additional_fields: Dict[str, Any],
+                       entry_data: Dict[str, Any]) -> bool:
+        """
+        Update a lead's status and log its entry attempt in one transaction.
+        
+        Parameters:
+        -----------
+        lead_id : int
+            The ID of the lead to update.
+        status : LeadStatus
+            The new status for the lead.
+        additional_fields : Dict[str, Any]
+            Additional lead fields to update.
+        entry_data : Dict[str, Any]
+            Data about the entry attempt.
+            
+        Returns:
+        --------
+        bool
+            True if the update was successful, False otherwise.
+        """
+        try:
+            return LeadRepository._finalize(lead_id, status, additional_fields, EntryLog, entry_data)
+        except Exception as e:
+            logger.error(f"Error finalizing entry: {str(e)}")
+            return False
+    
+    @staticmethod
+    def finalize_call(lead_id: int, status: LeadStatus, additional_fields: Dict[str, Any],
+                      call_data: Dict[str, Any]) -> bool:
+        """
+        Update a lead's status and log its call in one transaction.
+        
+        Parameters:
+        -----------
+        lead_id : int
+            The ID of the lead to update.
+        status : LeadStatus
+            The new status for the lead.
+        additional_fields : Dict[str, Any]
+            Additional lead fields to update.
+        call_data : Dict[str, Any]
+            Data about the call.
+            
+        Returns:
+        --------
+        bool
+            True if the update was successful, False otherwise.
+        """
+        try:
+            return LeadRepository._finalize(lead_id, status, additional_fields, CallLog, call_data)
+        except Exception as e:
+            logger.error(f"Error finalizing call: {str(e)}")
+            return False
+    
     @staticmethod
     def create_lead(lead_data: Dict[str, Any]) -> Optional[int]:
         """
@@ -188,52 +443,59 @@ class LeadRepository:
         """
         try:
             with get_db_session() as session:
-                lead = Lead(**lead_data)
-                session.add(lead)
-                session.commit()
-                return lead.id
+                return session.execute(insert(Lead).values(**lead_data).returning(Lead.id)).scalar_one()
         except Exception as e:
             logger.error(f"Error creating lead: {str(e)}")
             return None
     
     @staticmethod
-    def bulk_create_leads(leads_data: List[Dict[str, Any]]) -> Tuple[int, int]:
+    def bulk_create_leads(leads_data: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
         """
         Create multiple leads at once.
         
+        Rows are inserted BULK_INSERT_CHUNK_SIZE at a time in one transaction, so
+        a generator can be passed to import large files without holding every
+        row in memory. Each chunk runs under its own savepoint: a chunk that fails
+        is counted as failed and rolled back without losing the other chunks.
+        
         Parameters:
         -----------
-        leads_data : List[Dict[str, Any]]
-            A list of lead data dictionaries.
+        leads_data : Iterable[Dict[str, Any]]
+            The lead data dictionaries.
             
         Returns:
         --------
         Tuple[int, int]
             A tuple containing (success_count, failure_count).
         """
-        success_count = 0
-        failure_count = 0
+        rows = iter(leads_data)
+        success_count = failure_count = 0
         
-        with get_db_session() as session:
-            try:
-                for lead_data in leads_data:
+        try:
+            with get_db_session() as session:
+                # Large imports may run longer than the pool's statement timeout
+                session.execute(text("SET LOCAL statement_timeout = 0"))
+                
+                # Multi-row INSERTs (executemany) in chunks rather than one ORM flush per lead;
+                # RETURNING gives the exact number of rows inserted
+                while True:
+                    chunk = list(islice(rows, BULK_INSERT_CHUNK_SIZE))
+                    if not chunk:
+                        break
+                    
                     try:
-                        lead = Lead(**lead_data)
-                        session.add(lead)
-                        success_count += 1
+                        with session.begin_nested():
+                            inserted = len(session.scalars(insert(Lead).returning(Lead.id), chunk).all())
+                        success_count += inserted
+                        failure_count += len(chunk) - inserted
                     except Exception as e:
-                        logger.error(f"Error adding lead to batch: {str(e)}")
-                        failure_count += 1
-                
-                session.commit()
-            except Exception as e:
-                logger.error(f"Error in bulk lead creation: {str(e)}")
-                session.rollback()
-                # If we hit an error after some successful adds, count them as failures
-                failure_count += success_count
-                success_count = 0
-        
-        return success_count, failure_count
+                        logger.error(f"Error inserting {len(chunk)} leads: {str(e)}")
+                        failure_count += len(chunk)
+            return success_count, failure_count
+        except Exception as e:
+            logger.error(f"Error in bulk lead creation: {str(e)}")
+            # The transaction was rolled back; count the rows not yet consumed too
+            return 0, success_count + failure_count + sum(1 for _ in rows)
     
     @staticmethod
     def log_call(lead_id: int, call_data: Dict[str, Any]) -> Optional[int]:
@@ -254,10 +516,9 @@ class LeadRepository:
         """
         try:
             with get_db_session() as session:
-                call_log = CallLog(lead_id=lead_id, **call_data)
-                session.add(call_log)
-                session.commit()
-                return call_log.id
+                return session.execute(
+                    insert(CallLog).values(lead_id=lead_id, **call_data).returning(CallLog.id)
+                ).scalar_one()
         except Exception as e:
             logger.error(f"Error logging call: {str(e)}")
             return None
@@ -281,10 +542,9 @@ class LeadRepository:
         """
         try:
             with get_db_session() as session:
-                entry_log = EntryLog(lead_id=lead_id, **entry_data)
-                session.add(entry_log)
-                session.commit()
-                return entry_log.id
+                return session.execute(
+                    insert(EntryLog).values(lead_id=lead_id, **entry_data).returning(EntryLog.id)
+                ).scalar_one()
         except Exception as e:
             logger.error(f"Error logging entry: {str(e)}")
             return None
@@ -294,6 +554,29 @@ class LeadRepository:
         """
         Get statistics about leads in the system.
         
+        Results are reused for STATS_CACHE_TTL_SECONDS. Only one thread refreshes
+        an expired result; concurrent callers wait for it instead of all running
+        the aggregate query.
+        
+        Returns:
+        --------
+        Dict[str, Any]
+            A dictionary containing various statistics.
+        """
+        if time.monotonic() < _stats_cache["expires_at"]:
+            return _stats_cache["value"]
+        
+        with _stats_lock:
+            if time.monotonic() >= _stats_cache["expires_at"]:
+                _stats_cache["value"] = LeadRepository._query_lead_statistics()
+                _stats_cache["expires_at"] = time.monotonic() + STATS_CACHE_TTL_SECONDS
+            return _stats_cache["value"]
+    
+    @staticmethod
+    def _query_lead_statistics() -> Dict[str, Any]:
+        """
+        Query statistics about leads in the system.
+        
         Returns:
         --------
         Dict[str, Any]
@@ -308,28 +591,26 @@ class LeadRepository:
         }
         
         try:
+            today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+            
+            # Lead counts by status (an index-only scan of ix_leads_status_id, behind
+            # the TTL cache above), calls today and entries today in one round trip
+            stmt = union_all(
+                select(literal("status"), Lead.status, func.count(Lead.id)).group_by(Lead.status),
+                select(literal("calls"), null(), func.count(CallLog.id)).where(CallLog.initiated_at >= today_start),
+                select(literal("entries"), null(), func.count(EntryLog.id)).where(EntryLog.initiated_at >= today_start)
+            )
+            
             with get_db_session() as session:
-                # Total leads
-                stats["total_leads"] = session.query(func.count(Lead.id)).scalar()
-                
-                # Leads by status
-                status_counts = session.query(
-                    Lead.status, func.count(Lead.id)
-                ).group_by(Lead.status).all()
-                
-                for status, count in status_counts:
-                    stats["status_counts"][status.value] = count
-                
-                # Calls today
-                today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-                stats["calls_today"] = session.query(func.count(CallLog.id)).filter(
-                    CallLog.initiated_at >= today_start
-                ).scalar()
-                
-                # Entries today
-                stats["entries_today"] = session.query(func.count(EntryLog.id)).filter(
-                    EntryLog.initiated_at >= today_start
-                ).scalar()
+                for kind, status, count in session.execute(stmt):
+                    if kind == "calls":
+                        stats["calls_today"] = count
+                    elif kind == "entries":
+                        stats["entries_today"] = count
+                    else:
+                        stats["total_leads"] += count
+                        if status is not None:
+                            stats["status_counts"][status.value] = count
                 
                 # Success rate (leads entered / leads confirmed)
                 confirmed_count = stats["status_counts"].get("confirmed", 0) + stats["status_counts"].get("entered", 0)
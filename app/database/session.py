@@ -1,38 +1,62 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-import os
-from dotenv import load_dotenv
 from contextlib import contextmanager
 from loguru import logger
 
-load_dotenv()
+from app.config.settings import DATABASE_URL, DB_POOL_PRE_PING
 
-# Database connection parameters
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "5432")
-DB_NAME = os.getenv("DB_NAME", "lead_processing")
-DB_USER = os.getenv("DB_USER", "postgres")
-DB_PASSWORD = os.getenv("DB_PASSWORD", "")
+# Connection pool sizing
+DB_POOL_SIZE = 20
+DB_MAX_OVERFLOW = 10
+DB_POOL_TIMEOUT = 30
 
-# Create database URL
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# psycopg2 executemany tuning: INSERTs are packed into multi-row VALUES pages,
+# other executemany statements (UPDATE/DELETE) run through execute_batch
+DB_INSERT_PAGE_SIZE = 1000
+DB_BATCH_PAGE_SIZE = 500
+
+# Server-side cap on any one statement, so a runaway query can't hold a pool slot.
+# Bulk imports and schema setup lift it for their transaction with
+# SET LOCAL statement_timeout = 0
+DB_STATEMENT_TIMEOUT_MS = 5000
+
+# libpq TCP keepalives, so connections dropped by the network or server are
+# noticed while idle in the pool. JIT is turned off: the repository's queries
+# are short, and compiling them would cost more than running them
+DB_CONNECT_ARGS = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 3,
+    "options": f"-c jit=off -c statement_timeout={DB_STATEMENT_TIMEOUT_MS}",
+}
+
+# Compiled SQL cache entries; sized well above the repository's distinct statements
+DB_QUERY_CACHE_SIZE = 1200
 
 # Create database engine
 engine = create_engine(
     DATABASE_URL,
-    pool_size=20,
-    max_overflow=10,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
     pool_recycle=3600,
-    pool_pre_ping=True,
+    # Reuse the most recently returned connection so a few stay warm
+    pool_use_lifo=True,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=DB_CONNECT_ARGS,
+    executemany_mode="values_plus_batch",
+    insertmanyvalues_page_size=DB_INSERT_PAGE_SIZE,
+    executemany_batch_page_size=DB_BATCH_PAGE_SIZE,
+    query_cache_size=DB_QUERY_CACHE_SIZE,
+    enable_from_linting=False,
     echo=False,
 )
 
-# Create session factory
+# Create session factory; every get_db_session() block gets its own session
 SessionFactory = sessionmaker(bind=engine)
-
-# Create thread-safe scoped session
-Session = scoped_session(SessionFactory)
+Session = SessionFactory
 
 
 @contextmanager
@@ -48,7 +72,7 @@ def get_db_session():
     
     # Session is automatically closed after the block
     """
-    session = Session()
+    session = SessionFactory()
     try:
         yield session
         session.commit()
@@ -66,4 +90,66 @@ def get_engine():
     
     This is useful for direct engine operations and database migrations.
     """
-    return engine 
\ No newline at end of file
+    return engine 
+
+
+def warm_up_pool(size: int = DB_POOL_SIZE) -> int:
+    """
+    Open pooled connections ahead of the first requests.
+    
+    Each connection runs SELECT 1 and is returned to the pool, so the first
+    requests after startup don't pay for connection setup. Failures are logged
+    rather than raised.
+    
+    Parameters:
+    -----------
+    size : int, optional
+        Number of connections to open. Default is DB_POOL_SIZE.
+        
+    Returns:
+    --------
+    int
+        The number of connections opened.
+    """
+    connections = []
+    try:
+        for _ in range(size):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning(f"Database pool warm-up stopped after {len(connections)} connections: {str(e)}")
+    finally:
+        for connection in connections:
+            connection.close()
+    
+    return len(connections)
+
+
+@contextmanager
+def advisory_lock(key: int):
+    """
+    Context manager taking a PostgreSQL session advisory lock without waiting.
+    
+    The lock is held on a dedicated pooled connection for the duration of the
+    block, so it coordinates work across processes (e.g. API workers).
+    
+    Usage:
+    ------
+    with advisory_lock(SOME_KEY) as acquired:
+        if acquired:
+            # Only one process gets here at a time
+            ...
+    
+    Parameters:
+    -----------
+    key : int
+        The application-defined lock key.
+    """
+    with engine.connect() as connection:
+        acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
@@ -4,9 +4,8 @@ import asyncio
 import argparse
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Optional
 import signal
-import threading
-import time
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
@@ -14,6 +13,7 @@ sys.path.append(str(Path(__file__).resolve().parent.parent))
 from app.agents.voice_agent import VoiceAgent
 from app.agents.data_entry_agent import DataEntryAgent
 from app.utils.csv_processor import CSVProcessor
+from app.utils.s3_utils import s3_manager, RECORDING_UPLOAD_FLUSH_TIMEOUT
 from app.database.repository import LeadRepository
 from app.database.init_db import init_db
 from app.config.settings import (
@@ -38,7 +38,7 @@ class ApplicationManager:
         """
         self.voice_agent = None
         self.data_entry_agent = None
-        self.csv_processor_thread = None
+        self.csv_processor_task = None
         self.running = False
         self.startup_time = datetime.utcnow()
     
@@ -65,7 +65,10 @@ class ApplicationManager:
         
         # Create agents
         logger.info("Creating agents...")
-        self.voice_agent = VoiceAgent()
+        try:
+            self.voice_agent = VoiceAgent()
+        except ValueError as e:
+            logger.error(str(e))
         self.data_entry_agent = DataEntryAgent(headless=headless)
         
         # Set running flag
@@ -75,39 +78,44 @@ class ApplicationManager:
     
     def start_csv_processor(self, interval: int = 60):
         """
-        Start the CSV processor in a separate thread.
+        Start the CSV processor as a task on the running event loop.
+        
+        Each scan runs in a worker thread; the task is cancelled by stop().
         
         Parameters:
         -----------
         interval : int, optional
             Interval in seconds between CSV processing runs. Default is 60.
         """
-        def csv_processor_worker():
-            logger.info(f"Starting CSV processor (interval: {interval}s)")
-            
-            while self.running:
-                try:
-                    # Check for new CSV files and process them
-                    logger.info("Checking for new CSV files...")
-                    results = CSVProcessor.process_new_csv_files()
-                    
-                    if results["total_files"] > 0:
-                        logger.info(f"Processed {results['processed_files']}/{results['total_files']} files, imported {results['imported_leads']}/{results['total_leads']} leads")
-                    
-                    # Wait for the next interval
-                    for _ in range(interval):
-                        if not self.running:
-                            break
-                        time.sleep(1)
-                        
-                except Exception as e:
-                    logger.error(f"Error in CSV processor: {str(e)}")
-                    time.sleep(10)  # Wait a bit longer on error
+        self.csv_processor_task = asyncio.create_task(self._csv_processor_loop(interval))
+        logger.info("CSV processor task started")
+    
+    async def _csv_processor_loop(self, interval: int):
+        """
+        Process new CSV files every interval seconds while the application runs.
+        
+        Parameters:
+        -----------
+        interval : int
+            Interval in seconds between CSV processing runs.
+        """
+        logger.info(f"Starting CSV processor (interval: {interval}s)")
         
-        # Start the thread
-        self.csv_processor_thread = threading.Thread(target=csv_processor_worker, daemon=True)
-        self.csv_processor_thread.start()
-        logger.info("CSV processor thread started")
+        while self.running:
+            try:
+                # Check for new CSV files and process them
+                logger.info("Checking for new CSV files...")
+                results = await asyncio.to_thread(CSVProcessor.process_new_csv_files)
+                
+                if results["total_files"] > 0:
+                    logger.info(f"Processed {results['processed_files']}/{results['total_files']} files, imported {results['imported_leads']}/{results['total_leads']} leads")
+                
+                # Wait for the next interval
+                await asyncio.sleep(interval)
+                
+            except Exception as e:
+                logger.error(f"Error in CSV processor: {str(e)}")
+                await asyncio.sleep(10)  # Wait a bit longer on error
     
     async def start_agents(self, voice_batch_size: int = 5, data_entry_batch_size: int = 3):
         """
@@ -124,16 +132,19 @@ class ApplicationManager:
             # Start both agents in parallel
             logger.info("Starting agents...")
             
-            voice_task = asyncio.create_task(
-                self.voice_agent.run(batch_size=voice_batch_size, run_once=False)
-            )
+            tasks = [
+                asyncio.create_task(
+                    self.data_entry_agent.run(batch_size=data_entry_batch_size, run_once=False)
+                )
+            ]
             
-            data_entry_task = asyncio.create_task(
-                self.data_entry_agent.run(batch_size=data_entry_batch_size, run_once=False)
-            )
+            if self.voice_agent:
+                tasks.append(asyncio.create_task(
+                    self.voice_agent.run(batch_size=voice_batch_size, run_once=False)
+                ))
             
-            # Wait for both tasks to complete (they should run indefinitely until cancelled)
-            await asyncio.gather(voice_task, data_entry_task)
+            # Wait for all tasks to complete (they should run indefinitely until cancelled)
+            await asyncio.gather(*tasks)
             
         except asyncio.CancelledError:
             logger.info("Agents cancelled")
@@ -142,12 +153,24 @@ class ApplicationManager:
     
     def stop(self):
         """
-        Stop all components gracefully.
+        Stop all components. Does not block, so it is safe in a signal handler.
         """
         logger.info("Stopping application...")
         self.running = False
+        if self.csv_processor_task:
+            self.csv_processor_task.cancel()
+    
+    async def shutdown(self):
+        """
+        Stop all components gracefully.
         
-        # Other cleanup if needed
+        Waits for recording uploads in flight on a worker thread, so the event
+        loop keeps running while they finish.
+        """
+        self.stop()
+        
+        # Give recording uploads in flight a chance to finish
+        await asyncio.to_thread(s3_manager.flush, timeout=RECORDING_UPLOAD_FLUSH_TIMEOUT)
         
         logger.info("Application stopped")
     
@@ -161,7 +184,7 @@ class ApplicationManager:
             System status information.
         """
         # Get lead statistics
-        lead_stats = LeadRepository.get_lead_statistics()
+        lead_stats = await asyncio.to_thread(LeadRepository.get_lead_statistics)
         
         # Calculate uptime
         uptime = datetime.utcnow() - self.startup_time
@@ -175,7 +198,7 @@ class ApplicationManager:
             "started_at": self.startup_time.isoformat(),
             "lead_stats": lead_stats,
             "csv_processor": {
-                "running": self.csv_processor_thread is not None and self.csv_processor_thread.is_alive(),
+                "running": self.csv_processor_task is not None and not self.csv_processor_task.done(),
                 "import_directory": CSV_IMPORT_DIRECTORY
             },
             "voice_agent": {
@@ -186,33 +209,41 @@ class ApplicationManager:
             "data_entry_agent": {
                 "running": self.data_entry_agent is not None,
                 "max_concurrent_entries": MAX_CONCURRENT_DATA_ENTRIES,
-                "active_entries": self.data_entry_agent.active_entries if self.data_entry_agent else 0
+                "active_entries": len(self.data_entry_agent.active_leads) if self.data_entry_agent else 0
             }
         }
 
 
-async def main():
+async def main(args: Optional[argparse.Namespace] = None):
     """
     Main function to run the application.
+    
+    Parameters:
+    -----------
+    args : Optional[argparse.Namespace], optional
+        Already parsed options (reset_db, no_headless, voice_batch, entry_batch,
+        csv_interval and status_only), as passed by run.py. If None, they are
+        parsed from the command line.
     """
     # Configure logging
     log_file = "logs/application.log"
     os.makedirs(os.path.dirname(log_file), exist_ok=True)
     logger.add(log_file, rotation="10 MB", retention="7 days")
     
-    # Parse command line arguments
-    parser = argparse.ArgumentParser(description=f"{APP_NAME} - Multi-Agent Lead Processing System")
-    parser.add_argument("--reset-db", action="store_true", help="Reset the database on startup")
-    parser.add_argument("--no-headless", action="store_true", help="Run browsers in non-headless mode (visible)")
-    parser.add_argument("--voice-batch", type=int, default=5, help="Batch size for the Voice Agent")
-    parser.add_argument("--entry-batch", type=int, default=3, help="Batch size for the Data Entry Agent")
-    parser.add_argument("--csv-interval", type=int, default=60, help="Interval in seconds between CSV processing runs")
-    parser.add_argument("--api", action="store_true", help="Run the API server")
-    parser.add_argument("--api-only", action="store_true", help="Run only the API server without the main application")
-    parser.add_argument("--api-host", type=str, default="0.0.0.0", help="Host for the API server")
-    parser.add_argument("--api-port", type=int, default=8000, help="Port for the API server")
-    parser.add_argument("--status-only", action="store_true", help="Just print system status and exit")
-    args = parser.parse_args()
+    # Parse command line arguments, unless run.py already has
+    if args is None:
+        parser = argparse.ArgumentParser(description=f"{APP_NAME} - Multi-Agent Lead Processing System")
+        parser.add_argument("--reset-db", action="store_true", help="Reset the database on startup")
+        parser.add_argument("--no-headless", action="store_true", help="Run browsers in non-headless mode (visible)")
+        parser.add_argument("--voice-batch", type=int, default=5, help="Batch size for the Voice Agent")
+        parser.add_argument("--entry-batch", type=int, default=3, help="Batch size for the Data Entry Agent")
+        parser.add_argument("--csv-interval", type=int, default=60, help="Interval in seconds between CSV processing runs")
+        parser.add_argument("--api", action="store_true", help="Run the API server")
+        parser.add_argument("--api-only", action="store_true", help="Run only the API server without the main application")
+        parser.add_argument("--api-host", type=str, default="0.0.0.0", help="Host for the API server")
+        parser.add_argument("--api-port", type=int, default=8000, help="Port for the API server")
+        parser.add_argument("--status-only", action="store_true", help="Just print system status and exit")
+        args = parser.parse_args()
     
     # Set up signal handlers for graceful shutdown
     def signal_handler(sig, frame):
@@ -258,7 +289,7 @@ async def main():
     except Exception as e:
         logger.error(f"Application error: {str(e)}")
     finally:
-        app_manager.stop()
+        await app_manager.shutdown()
 
 
 if __name__ == "__main__":
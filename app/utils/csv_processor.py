@@ -1,25 +1,41 @@
 import os
 import csv
-import pandas as pd
+import functools
+import operator
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, Optional
 from loguru import logger
-from pathlib import Path
 
 from app.database.models import Lead, LeadStatus
 from app.database.repository import LeadRepository
+from app.database.session import advisory_lock
 
-# Load environment variables
-from dotenv import load_dotenv
-load_dotenv()
-
-# CSV import/export directories
+# CSV import/export directories (.env is loaded by app.config.settings)
 CSV_IMPORT_DIR = os.getenv("CSV_IMPORT_DIRECTORY", "data/import")
 CSV_EXPORT_DIR = os.getenv("CSV_EXPORT_DIRECTORY", "data/export")
 
+# Imported files are moved here once their rows are inserted
+CSV_PROCESSED_DIR = os.path.join(CSV_IMPORT_DIR, "processed")
+
 # Ensure directories exist
 os.makedirs(CSV_IMPORT_DIR, exist_ok=True)
 os.makedirs(CSV_EXPORT_DIR, exist_ok=True)
+os.makedirs(CSV_PROCESSED_DIR, exist_ok=True)
+
+# Import scans requested within this many seconds of the last one are skipped
+CSV_SCAN_DEBOUNCE_SECONDS = 5
+
+# PostgreSQL advisory lock key serializing import scans across processes
+CSV_SCAN_LOCK_KEY = 42
+
+# Import files processed concurrently during a scan, each with its own session
+CSV_IMPORT_MAX_WORKERS = int(os.getenv("CSV_IMPORT_MAX_WORKERS", "4"))
+
+_scan_lock = threading.Lock()
+_last_scan = 0.0
 
 
 class CSVProcessor:
@@ -71,6 +87,17 @@ class CSVProcessor:
         "entry_notes": "Entry Notes"
     }
 
+    # Lead attributes written on export, in column order, their CSV headers, and a
+    # getter for all of them
+    EXPORT_FIELDS = list(MODEL_TO_CSV_MAPPING) + list(EXPORT_ADDITIONAL_FIELDS)
+    EXPORT_HEADERS = list(MODEL_TO_CSV_MAPPING.values()) + list(EXPORT_ADDITIONAL_FIELDS.values())
+    _export_getter = operator.attrgetter(*EXPORT_FIELDS)
+    _STATUS_INDEX = EXPORT_FIELDS.index("status")
+    _TCPA_INDEX = EXPORT_FIELDS.index("tcpa_accepted")
+
+    # Write buffer for export files
+    EXPORT_BUFFER_SIZE = 1 << 20
+
     @classmethod
     def import_csv_file(cls, file_path: str) -> Tuple[int, int, List[str]]:
         """
@@ -85,73 +112,77 @@ class CSVProcessor:
         --------
         Tuple[int, int, List[str]]
             A tuple containing (success_count, failure_count, error_messages).
+            failure_count counts rows, except when the whole file is rejected
+            (not found, or missing required columns): its rows are not read
+            and a single failure is reported for the file.
         """
         if not os.path.exists(file_path):
             logger.error(f"CSV file not found: {file_path}")
             return 0, 1, ["File not found"]
 
         try:
-            # Read CSV file
-            df = pd.read_csv(file_path)
-            
-            # Check required columns
-            required_columns = ["Firstname", "Lastname", "Email", "Phone1"]
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            
-            if missing_columns:
-                error_msg = f"CSV file missing required columns: {', '.join(missing_columns)}"
-                logger.error(error_msg)
-                return 0, df.shape[0], [error_msg]
-            
-            # Convert DataFrame to list of dictionaries
-            leads_data = []
-            error_rows = []
-            
-            for index, row in df.iterrows():
-                try:
-                    lead_data = {}
-                    
-                    # Map CSV columns to model fields
-                    for csv_col, model_field in cls.CSV_TO_MODEL_MAPPING.items():
-                        if csv_col in df.columns:
-                            # Handle empty or NaN values
-                            value = row[csv_col]
-                            if pd.notna(value):
-                                lead_data[model_field] = str(value).strip()
-                            else:
-                                lead_data[model_field] = None
-                    
-                    # Set default status
-                    lead_data["status"] = LeadStatus.PENDING
-                    
-                    # Add to leads data
-                    leads_data.append(lead_data)
-                except Exception as e:
-                    logger.error(f"Error processing row {index}: {str(e)}")
-                    error_rows.append(index)
-            
-            # Bulk insert leads
-            success_count, failure_count = LeadRepository.bulk_create_leads(leads_data)
+            # Stream the file row by row; values stay text, so zip codes and phone
+            # numbers keep their digits
+            with open(file_path, newline="", encoding="utf-8-sig") as csv_file:
+                reader = csv.reader(csv_file)
+                header = next(reader, [])
+                
+                # Check required columns
+                required_columns = ["Firstname", "Lastname", "Email", "Phone1"]
+                missing_columns = [col for col in required_columns if col not in header]
+                
+                if missing_columns:
+                    error_msg = f"CSV file missing required columns: {', '.join(missing_columns)}"
+                    logger.error(error_msg)
+                    # Reject the file from its header alone rather than reading every
+                    # row, so the failure counts the file rather than its rows
+                    return 0, 1, [error_msg]
+                
+                # Position of each mapped column in the file
+                field_indexes = cls._field_indexes(tuple(header))
+                
+                # Bulk insert leads as rows are read
+                success_count, failure_count = LeadRepository.bulk_create_leads(
+                    cls._lead_records(reader, field_indexes)
+                )
             
             # Move the processed file to a processed directory
-            processed_dir = os.path.join(os.path.dirname(file_path), "processed")
-            os.makedirs(processed_dir, exist_ok=True)
-            
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            processed_file = os.path.join(
-                processed_dir, 
-                f"{Path(file_path).stem}_{timestamp}{Path(file_path).suffix}"
-            )
-            
-            os.rename(file_path, processed_file)
+            processed_file = cls._move_to_processed(file_path)
+            logger.debug(f"Moved imported CSV to {processed_file}")
             
             logger.info(f"CSV import completed. Success: {success_count}, Failures: {failure_count}")
-            return success_count, failure_count, [f"Error in row {idx}" for idx in error_rows]
+            return success_count, failure_count, []
             
         except Exception as e:
             logger.error(f"Error importing CSV: {str(e)}")
             return 0, 1, [str(e)]
 
+    @staticmethod
+    def _move_to_processed(file_path: str) -> str:
+        """
+        Move an imported CSV file into the processed directory beside it.
+
+        Parameters:
+        -----------
+        file_path : str
+            Path to the imported CSV file.
+
+        Returns:
+        --------
+        str
+            The file's new path, with a timestamp added to its name.
+        """
+        processed_dir = os.path.join(os.path.dirname(file_path), "processed")
+        if os.path.abspath(processed_dir) != os.path.abspath(CSV_PROCESSED_DIR):
+            os.makedirs(processed_dir, exist_ok=True)
+        
+        timestamp = time.strftime("%Y%m%d%H%M%S")
+        stem, suffix = os.path.splitext(os.path.basename(file_path))
+        processed_file = os.path.join(processed_dir, f"{stem}_{timestamp}{suffix}")
+        
+        os.replace(file_path, processed_file)
+        return processed_file
+
     @classmethod
     def export_leads_to_csv(cls, leads: List[Lead], file_path: Optional[str] = None) -> str:
         """
@@ -174,36 +205,21 @@ class CSVProcessor:
                 timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
                 file_path = os.path.join(CSV_EXPORT_DIR, f"exported_leads_{timestamp}.csv")
             
-            # Prepare data for export                                       
-            export_data = []
-            
-            for lead in leads:
-                lead_data = {}
-                
-                # Add basic fields
-                for model_field, csv_col in cls.MODEL_TO_CSV_MAPPING.items():
-                    if hasattr(lead, model_field):
-                        lead_data[csv_col] = getattr(lead, model_field)
-                
-                # Add additional fields
-                for model_field, csv_col in cls.EXPORT_ADDITIONAL_FIELDS.items():
-                    if hasattr(lead, model_field):
-                        value = getattr(lead, model_field)
-                        
-                        # Handle special cases
-                        if model_field == "status" and value is not None:
-                            lead_data[csv_col] = value.value
-                        elif model_field == "tcpa_accepted":
-                            lead_data[csv_col] = "Yes" if value else "No"
-                        else:
-                            lead_data[csv_col] = value
-                
-                export_data.append(lead_data)
-            
-            # Create DataFrame and export to CSV
-            df = pd.DataFrame(export_data)
+            # Write one row per lead straight from its attributes
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            df.to_csv(file_path, index=False)
+            with open(file_path, "w", newline="", encoding="utf-8", buffering=cls.EXPORT_BUFFER_SIZE) as csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow(cls.EXPORT_HEADERS)
+                
+                for lead in leads:
+                    row = list(cls._export_getter(lead))
+                    
+                    # Handle special cases
+                    status = row[cls._STATUS_INDEX]
+                    row[cls._STATUS_INDEX] = status.value if status is not None else None
+                    row[cls._TCPA_INDEX] = "Yes" if row[cls._TCPA_INDEX] else "No"
+                    
+                    writer.writerow(row)
             
             logger.info(f"Exported {len(leads)} leads to {file_path}")
             return file_path
@@ -212,16 +228,78 @@ class CSVProcessor:
             logger.error(f"Error exporting leads to CSV: {str(e)}")
             raise
 
+    @classmethod
+    @functools.lru_cache(maxsize=8)
+    def _field_indexes(cls, header: Tuple[str, ...]) -> Tuple[Tuple[int, str], ...]:
+        """
+        Map an import file's header to the model fields it provides.
+        
+        Results are cached per header, since import files usually share one layout.
+        
+        Parameters:
+        -----------
+        header : Tuple[str, ...]
+            The column names from the file's first row.
+            
+        Returns:
+        --------
+        Tuple[Tuple[int, str], ...]
+            (column position, model field) for each mapped column present.
+        """
+        return tuple(
+            (header.index(csv_col), model_field)
+            for csv_col, model_field in cls.CSV_TO_MODEL_MAPPING.items()
+            if csv_col in header
+        )
+    
+    @staticmethod
+    def _lead_records(rows: Iterable[List[str]], field_indexes: Iterable[Tuple[int, str]]) -> Iterator[Dict[str, Any]]:
+        """
+        Turn rows of an import CSV into lead data dictionaries.
+        
+        Values are stripped; empty values and missing trailing cells become None.
+        
+        Parameters:
+        -----------
+        rows : Iterable[List[str]]
+            The data rows, as produced by csv.reader.
+        field_indexes : Iterable[Tuple[int, str]]
+            (column position, model field) for each mapped column.
+            
+        Yields:
+        -------
+        Dict[str, Any]
+            The lead data for each non-blank row, with status PENDING.
+        """
+        for row in rows:
+            if not row:
+                continue
+            
+            lead_data = {
+                model_field: (row[index].strip() or None) if index < len(row) else None
+                for index, model_field in field_indexes
+            }
+            
+            # Set default status
+            lead_data["status"] = LeadStatus.PENDING
+            
+            yield lead_data
+
     @classmethod
     def process_new_csv_files(cls) -> Dict[str, Any]:
         """
         Process all new CSV files in the import directory.
+        
+        Only one scan runs at a time, across threads and processes; a request
+        made while a scan is running, or within CSV_SCAN_DEBOUNCE_SECONDS of the
+        last one, is skipped and reported with "skipped" set.
 
         Returns:
         --------
         Dict[str, Any]
             A dictionary with import statistics.
         """
+        global _last_scan
         results = {
             "total_files": 0,
             "processed_files": 0,
@@ -229,48 +307,78 @@ class CSVProcessor:
             "total_leads": 0,
             "imported_leads": 0,
             "failed_leads": 0,
-            "files": []
+            "files": [],
+            "skipped": False
         }
         
+        if not _scan_lock.acquire(blocking=False):
+            logger.info("CSV import scan already running, skipping")
+            results["skipped"] = True
+            return results
+        
+        try:
+            if time.monotonic() - _last_scan < CSV_SCAN_DEBOUNCE_SECONDS:
+                logger.info("CSV import scan ran moments ago, skipping")
+                results["skipped"] = True
+                return results
+            
+            with advisory_lock(CSV_SCAN_LOCK_KEY) as acquired:
+                if not acquired:
+                    logger.info("CSV import scan running in another process, skipping")
+                    results["skipped"] = True
+                    return results
+                
+                _last_scan = time.monotonic()
+                return cls._scan_import_directory(results)
+        except Exception as e:
+            logger.error(f"Error processing CSV files: {str(e)}")
+            return results
+        finally:
+            _scan_lock.release()
+    
+    @classmethod
+    def _scan_import_directory(cls, results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Import every CSV file in the import directory.
+        
+        Parameters:
+        -----------
+        results : Dict[str, Any]
+            The statistics dictionary to fill in.
+            
+        Returns:
+        --------
+        Dict[str, Any]
+            The filled-in statistics.
+        """
         try:
-            # Get all CSV files in the import directory
-            csv_files = [
-                os.path.join(CSV_IMPORT_DIR, f) 
-                for f in os.listdir(CSV_IMPORT_DIR) 
-                if f.lower().endswith(".csv") and os.path.isfile(os.path.join(CSV_IMPORT_DIR, f))
-            ]
+            # Get all CSV files in the import directory; scandir entries carry the
+            # file type from the directory read, so no per-file stat is needed
+            with os.scandir(CSV_IMPORT_DIR) as entries:
+                csv_files = [
+                    entry.path
+                    for entry in entries
+                    if entry.name.lower().endswith(".csv") and entry.is_file()
+                ]
             
             results["total_files"] = len(csv_files)
             
-            # Process each file
-            for file_path in csv_files:
-                file_result = {
-                    "file": os.path.basename(file_path),
-                    "status": "success",
-                    "imported": 0,
-                    "failed": 0,
-                    "error": None
-                }
-                
-                try:
-                    success, failure, errors = cls.import_csv_file(file_path)
-                    
-                    file_result["imported"] = success
-                    file_result["failed"] = failure
-                    results["imported_leads"] += success
-                    results["failed_leads"] += failure
-                    results["total_leads"] += (success + failure)
-                    
-                    if failure > 0:
-                        file_result["error"] = errors[0] if errors else "Unknown error"
-                        file_result["status"] = "partial"
-                    
-                    results["processed_files"] += 1
-                    
-                except Exception as e:
-                    file_result["status"] = "failed"
-                    file_result["error"] = str(e)
+            # Import files concurrently; results come back in directory order
+            if csv_files:
+                workers = min(CSV_IMPORT_MAX_WORKERS, len(csv_files))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="csv-import") as executor:
+                    file_results = list(executor.map(cls._import_file_result, csv_files))
+            else:
+                file_results = []
+            
+            for file_result in file_results:
+                if file_result["status"] == "failed":
                     results["failed_files"] += 1
+                else:
+                    results["processed_files"] += 1
+                    results["imported_leads"] += file_result["imported"]
+                    results["failed_leads"] += file_result["failed"]
+                    results["total_leads"] += file_result["imported"] + file_result["failed"]
                 
                 results["files"].append(file_result)
             
@@ -279,4 +387,43 @@ class CSVProcessor:
             
         except Exception as e:
             logger.error(f"Error processing CSV files: {str(e)}")
-            return results 
\ No newline at end of file
+            return results 
+    
+    @classmethod
+    def _import_file_result(cls, file_path: str) -> Dict[str, Any]:
+        """
+        Import one CSV file and summarize the outcome for a scan report.
+        
+        Parameters:
+        -----------
+        file_path : str
+            Path to the CSV file to import.
+            
+        Returns:
+        --------
+        Dict[str, Any]
+            The per-file entry for the scan's "files" list.
+        """
+        file_result = {
+            "file": os.path.basename(file_path),
+            "status": "success",
+            "imported": 0,
+            "failed": 0,
+            "error": None
+        }
+        
+        try:
+            success, failure, errors = cls.import_csv_file(file_path)
+            
+            file_result["imported"] = success
+            file_result["failed"] = failure
+            
+            if failure > 0:
+                file_result["error"] = errors[0] if errors else "Unknown error"
+                file_result["status"] = "partial"
+            
+        except Exception as e:
+            file_result["status"] = "failed"
+            file_result["error"] = str(e)
+        
+        return file_result
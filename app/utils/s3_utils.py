@@ -1,5 +1,11 @@
 import os
+import re
+import threading
 import boto3
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from datetime import datetime
 from typing import Optional, Dict, Any
@@ -7,6 +13,54 @@ from loguru import logger
 
 from app.config.settings import AWS_ACCESS_KEY, AWS_SECRET_KEY, AWS_REGION, AWS_BUCKET, AWS_FOLDER, PUBLISHER_ID
 
+# Anything that is not a digit, stripped from phone numbers in recording names
+NON_DIGIT_PATTERN = re.compile(r"\D")
+
+# Upload recordings larger than 4 MB in parallel 4 MB parts
+RECORDING_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=4 * 1024 * 1024,
+    multipart_chunksize=4 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True
+)
+
+# Recording uploads running at once, on a pool separate from the event loop's
+# default executor so slow uploads don't hold up database calls
+RECORDING_UPLOAD_WORKERS = 8
+
+# Seconds to wait for recording uploads in flight when shutting down
+RECORDING_UPLOAD_FLUSH_TIMEOUT = 30
+
+# Keep-alive connections, enough for several concurrent multipart uploads, and
+# adaptive retries that back off when S3 throttles
+S3_CLIENT_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=32,
+    retries={"max_attempts": 3, "mode": "adaptive"}
+)
+
+
+@lru_cache(maxsize=1)
+def _s3_client():
+    """
+    S3 client with credentials from settings, shared by every S3Manager.
+    
+    It comes from a session of its own rather than boto3's shared default
+    session; clients are thread-safe, so uploads on any thread can use it.
+    """
+    session = boto3.session.Session(
+        aws_access_key_id=AWS_ACCESS_KEY,
+        aws_secret_access_key=AWS_SECRET_KEY,
+        region_name=AWS_REGION
+    )
+    return session.client('s3', config=S3_CLIENT_CONFIG)
+
+
+class UploadCancelled(Exception):
+    """
+    Raised from the transfer callback to abort an upload that was cancelled.
+    """
+
 
 class S3Manager:
     """
@@ -15,22 +69,29 @@ class S3Manager:
     
     def __init__(self):
         """
-        Initialize S3 client with credentials from settings.
+        Initialize S3 settings; the client is created on first use.
         """
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=AWS_ACCESS_KEY,
-            aws_secret_access_key=AWS_SECRET_KEY,
-            region_name=AWS_REGION
-        )
         self.bucket = AWS_BUCKET
         self.folder = AWS_FOLDER
         self.publisher_id = PUBLISHER_ID
+        self._upload_pool = ThreadPoolExecutor(
+            max_workers=RECORDING_UPLOAD_WORKERS,
+            thread_name_prefix="s3-upload"
+        )
+        self._pending_uploads = set()
+    
+    @property
+    def s3_client(self):
+        """
+        The shared S3 client, created on first access.
+        """
+        return _s3_client()
     
     def upload_recording(self, 
                          phone_number: str, 
                          file_path: str, 
-                         call_timestamp: Optional[datetime] = None) -> Dict[str, Any]:
+                         call_timestamp: Optional[datetime] = None,
+                         cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
         """
         Upload a call recording to S3.
         
@@ -42,6 +103,8 @@ class S3Manager:
             Local path to the recording file.
         call_timestamp : Optional[datetime], default=None
             Timestamp of the call. If None, current time will be used.
+        cancel_event : Optional[threading.Event], default=None
+            If given, the upload is aborted as soon as the event is set.
             
         Returns:
         --------
@@ -55,7 +118,7 @@ class S3Manager:
         
         try:
             # Clean phone number (remove non-numeric characters)
-            clean_phone = ''.join(filter(str.isdigit, phone_number))
+            clean_phone = NON_DIGIT_PATTERN.sub('', phone_number)
             
             # Use current time if no timestamp provided
             if not call_timestamp:
@@ -77,7 +140,9 @@ class S3Manager:
             self.s3_client.upload_file(
                 file_path,
                 self.bucket,
-                s3_key
+                s3_key,
+                Config=RECORDING_TRANSFER_CONFIG,
+                Callback=self._cancel_callback(cancel_event) if cancel_event else None
             )
             
             # Generate URL for the uploaded file
@@ -93,6 +158,9 @@ class S3Manager:
                 "filename": s3_filename
             }
             
+        except UploadCancelled:
+            logger.warning(f"Recording upload cancelled: {file_path}")
+            return {"success": False, "error": "Upload cancelled", "url": None}
         except ClientError as e:
             error_msg = f"S3 upload error: {str(e)}"
             logger.error(error_msg)
@@ -102,6 +170,62 @@ class S3Manager:
             logger.error(error_msg)
             return {"success": False, "error": error_msg, "url": None}
     
+    def upload_recording_async(self,
+                               phone_number: str,
+                               file_path: str,
+                               call_timestamp: Optional[datetime] = None,
+                               cancel_event: Optional[threading.Event] = None) -> "Future[Dict[str, Any]]":
+        """
+        Start uploading a call recording to S3 on the upload pool.
+        
+        Takes the same parameters as upload_recording.
+        
+        Returns:
+        --------
+        Future[Dict[str, Any]]
+            Resolves to the upload_recording response dictionary.
+        """
+        future = self._upload_pool.submit(
+            self.upload_recording, phone_number, file_path, call_timestamp, cancel_event
+        )
+        self._pending_uploads.add(future)
+        future.add_done_callback(self._pending_uploads.discard)
+        return future
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for uploads started with upload_recording_async to finish.
+        
+        Parameters:
+        -----------
+        timeout : Optional[float], default=None
+            Maximum number of seconds to wait. If None, wait indefinitely.
+            
+        Returns:
+        --------
+        bool
+            True if no uploads are still running.
+        """
+        _, not_done = wait(list(self._pending_uploads), timeout=timeout)
+        if not_done:
+            logger.warning(f"{len(not_done)} recording uploads still running")
+        return not not_done
+    
+    @staticmethod
+    def _cancel_callback(cancel_event: threading.Event):
+        """
+        Build a transfer progress callback that aborts the upload once the event is set.
+        
+        Parameters:
+        -----------
+        cancel_event : threading.Event
+            Event signalling that the upload should stop.
+        """
+        def callback(bytes_transferred: int) -> None:
+            if cancel_event.is_set():
+                raise UploadCancelled()
+        return callback
+    
     def check_credentials(self) -> bool:
         """
         Check if AWS credentials are valid.
@@ -163,5 +287,5 @@ class S3Manager:
             return {"success": False, "error": error_msg, "files": [], "count": 0}
 
 
-# Singleton instance
+# Singleton instance (cheap to create; the S3 client is built on first upload)
 s3_manager = S3Manager() 
\ No newline at end of file
@@ -8,20 +8,19 @@ import sys
 import asyncio
 import argparse
 import subprocess
-import threading
 from pathlib import Path
 
 # Add the project directory to the path
 sys.path.append(str(Path(__file__).resolve().parent))
 
 from app.main import main as run_application
-from app.api.api import start_api_server
-from app.config.settings import APP_NAME, APP_VERSION
+from app.api.api import start_api_server, create_api_server
+from app.config.settings import APP_NAME, APP_VERSION, API_WORKERS
 
 
-def start_api_server_thread(host, port):
+async def run_with_api(host, port, application_args):
     """
-    Start the API server in a separate thread.
+    Run the application and the API server on one event loop.
     
     Parameters:
     -----------
@@ -29,13 +28,19 @@ def start_api_server_thread(host, port):
         The host to bind to.
     port : int
         The port to listen on.
+    application_args : argparse.Namespace
+        Options for the application, as taken by app.main.main.
     """
-    # Import API server here to avoid circular imports
-    from app.api.api import start_api_server
-    
-    # Start the API server
     print(f"Starting API server on {host}:{port}")
-    start_api_server(host=host, port=port)
+    server = create_api_server(host=host, port=port)
+    api_task = asyncio.create_task(server.serve())
+    
+    try:
+        await run_application(application_args)
+    finally:
+        # Let the API finish in-flight requests before the loop closes
+        server.should_exit = True
+        await api_task
 
 
 def main():
@@ -52,6 +57,7 @@ def main():
     parser.add_argument("--api-only", action="store_true", help="Run only the API server without the main application")
     parser.add_argument("--api-host", type=str, default="0.0.0.0", help="Host for the API server")
     parser.add_argument("--api-port", type=int, default=8000, help="Port for the API server")
+    parser.add_argument("--api-workers", type=int, default=API_WORKERS, help="Worker processes for the API server (API-only mode)")
     parser.add_argument("--status-only", action="store_true", help="Just print system status and exit")
     
     args = parser.parse_args()
@@ -72,36 +78,12 @@ def main():
     
     # If API only mode, just start the API server
     if args.api_only:
-        print(f"Running in API-only mode on {args.api_host}:{args.api_port}")
-        start_api_server(host=args.api_host, port=args.api_port)
+        print(f"Running in API-only mode on {args.api_host}:{args.api_port} ({args.api_workers} workers)")
+        start_api_server(host=args.api_host, port=args.api_port, workers=args.api_workers)
         return
     
-    # If running the main application
-    if args.api:
-        # Start API server in a thread
-        api_thread = threading.Thread(
-            target=start_api_server_thread, 
-            args=(args.api_host, args.api_port),
-            daemon=True
-        )
-        api_thread.start()
-    
-    # Set up arguments for the main application
-    app_args = []
-    if args.reset_db:
-        app_args.append("--reset-db")
-    if args.no_headless:
-        app_args.append("--no-headless")
-    if args.status_only:
-        app_args.append("--status-only")
-    
-    app_args.extend([
-        "--voice-batch", str(args.voice_batch),
-        "--entry-batch", str(args.entry_batch),
-        "--csv-interval", str(args.csv_interval)
-    ])
-    
-    # Run the actual application
+    # Options for the main application (it doesn't re-parse the command line,
+    # which carries run.py-only options such as --api-workers)
     application_args = argparse.Namespace(
         reset_db=args.reset_db,
         no_headless=args.no_headless,
@@ -111,13 +93,11 @@ def main():
         status_only=args.status_only
     )
     
-    # Run the application
-    asyncio.run(run_application())
-    
-    # If we're running the API server in a thread, wait for it to complete
-    if args.api and api_thread.is_alive():
-        print("Waiting for API server to shutdown...")
-        api_thread.join(timeout=5)
+    # Run the application, serving the API from the same event loop if requested
+    if args.api:
+        asyncio.run(run_with_api(args.api_host, args.api_port, application_args))
+    else:
+        asyncio.run(run_application(application_args))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,139 @@
+import sys
+import hmac
+import hashlib
+import unittest
+from pathlib import Path
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+# Add the parent directory to the path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+
+from app.api import api
+from app.database.models import LeadStatus
+
+
+def make_lead(lead_id: int, updated_at: datetime = None) -> SimpleNamespace:
+    """
+    Build a stand-in for a lead row as returned by the repository.
+
+    Parameters:
+    -----------
+    lead_id : int
+        The lead ID.
+    updated_at : datetime, optional
+        The lead's last update time.
+
+    Returns:
+    --------
+    SimpleNamespace
+        An object with the lead attributes the API reads.
+    """
+    return SimpleNamespace(
+        id=lead_id,
+        firstname="John",
+        lastname="Doe",
+        email=f"john{lead_id}@example.com",
+        phone1="1234567890",
+        address=None,
+        city=None,
+        state=None,
+        zip=None,
+        status=LeadStatus.PENDING,
+        created_at=datetime(2024, 1, 1),
+        updated_at=updated_at
+    )
+
+
+class TestAPI(unittest.TestCase):
+    """
+    Test the API routes with a mocked repository; no database needed.
+    """
+
+    def setUp(self):
+        """Set up the test."""
+        warm_up_patcher = mock.patch.object(api, "warm_up_pool", lambda *args: 0)
+        repository_patcher = mock.patch.object(api, "LeadRepository")
+        warm_up_patcher.start()
+        self.repository = repository_patcher.start()
+        self.addCleanup(warm_up_patcher.stop)
+        self.addCleanup(repository_patcher.stop)
+
+        # Entering the client runs the app's lifespan, as on a real startup
+        self.client = TestClient(api.app)
+        self.client.__enter__()
+        self.addCleanup(self.client.__exit__, None, None, None)
+
+    def test_leads_cursor(self):
+        """Test that a page of leads carries the next page's cursor."""
+        self.repository.get_leads_by_status_after.return_value = [make_lead(3), make_lead(7)]
+
+        response = self.client.get("/leads", params={"status": "pending", "after_id": 2, "limit": 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([lead["id"] for lead in response.json()], [3, 7])
+        self.assertEqual(response.headers["X-Next-Cursor"], "7")
+        self.repository.get_leads_by_status_after.assert_called_once_with(LeadStatus.PENDING, after_id=2, limit=2)
+
+    def test_leads_last_page(self):
+        """Test that an empty page has no cursor."""
+        self.repository.get_leads_by_status_after.return_value = []
+
+        response = self.client.get("/leads", params={"after_id": 7})
+
+        self.assertEqual(response.json(), [])
+        self.assertNotIn("X-Next-Cursor", response.headers)
+
+    def test_lead_etag(self):
+        """Test that a lead's ETag gets a 304 when sent back unchanged."""
+        self.repository.get_lead_by_id.return_value = make_lead(5, updated_at=datetime(2024, 1, 2))
+
+        response = self.client.get("/leads/5")
+        etag = response.headers["ETag"]
+        self.assertEqual(response.json()["id"], 5)
+
+        not_modified = self.client.get("/leads/5", headers={"If-None-Match": etag})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b"")
+
+        self.repository.get_lead_by_id.return_value = make_lead(5, updated_at=datetime(2024, 1, 3))
+        modified = self.client.get("/leads/5", headers={"If-None-Match": etag})
+        self.assertEqual(modified.status_code, 200)
+        self.assertNotEqual(modified.headers["ETag"], etag)
+
+    def test_cors_exposes_headers(self):
+        """Test that cross-origin clients may read the cursor and ETag headers."""
+        self.repository.get_leads_by_status_after.return_value = [make_lead(1)]
+
+        response = self.client.get("/leads", headers={"Origin": "http://dashboard.example.com"})
+        exposed = {header.strip() for header in response.headers["Access-Control-Expose-Headers"].split(",")}
+
+        self.assertTrue({"X-Next-Cursor", "ETag"} <= exposed)
+
+    def test_call_event_signature(self):
+        """Test that call events need a valid signature and only trigger a status check."""
+        body = b'{"call_id": "call-1", "status": "completed"}'
+        signature = hmac.new(b"secret", body, hashlib.sha256).hexdigest()
+
+        with mock.patch.object(api, "ASSISTABLE_WEBHOOK_SECRET", "secret"), \
+                mock.patch.object(api, "dispatch_call_event", return_value=True) as dispatch:
+            rejected = self.client.post("/calls/events", content=body, headers={"X-Assistable-Signature": "0" * 64})
+            accepted = self.client.post("/calls/events", content=body, headers={"X-Assistable-Signature": signature})
+
+        self.assertEqual(rejected.status_code, 401)
+        self.assertEqual(accepted.json(), {"status": "success", "delivered": True})
+        dispatch.assert_called_once_with("call-1")
+
+    def test_call_event_without_secret(self):
+        """Test that call events are refused while no webhook secret is configured."""
+        with mock.patch.object(api, "ASSISTABLE_WEBHOOK_SECRET", None):
+            response = self.client.post("/calls/events", content=b'{"call_id": "call-1"}')
+
+        self.assertEqual(response.status_code, 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,12 +8,99 @@ from datetime import datetime
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from app.database.models import Lead, LeadStatus, Base
-from app.database.repository import LeadRepository
+from app.database.repository import LeadRepository, _status_update
 from app.database.session import get_db_session, engine
 
 import tempfile
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, raiseload
+from sqlalchemy.pool import StaticPool
+
+
+@contextmanager
+def count_queries(bind):
+    """
+    Collect the SQL statements executed on an engine or connection.
+    
+    Parameters:
+    -----------
+    bind : Engine or Connection
+        Where to listen for statements.
+        
+    Yields:
+    -------
+    List[str]
+        The statements executed inside the block, filled in as they run.
+    """
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(bind, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", before_cursor_execute)
+
+
+class TestLeadStatusEnum(unittest.TestCase):
+    """
+    Test the LeadStatus enum; no database needed.
+    """
+
+    def test_lead_status_values(self):
+        """Test that all required statuses exist with their stored values."""
+        expected = {
+            "PENDING": "pending",
+            "CALLING": "calling",
+            "CONFIRMED": "confirmed",
+            "NOT_INTERESTED": "not_interested",
+            "CALL_FAILED": "call_failed",
+            "ENTRY_IN_PROGRESS": "entry_in_progress",
+            "ENTERED": "entered",
+            "ENTRY_FAILED": "entry_failed"
+        }
+        
+        for name, value in expected.items():
+            with self.subTest(status=name):
+                self.assertEqual(LeadStatus[name].value, value)
+
+
+class TestStatusUpdate(unittest.TestCase):
+    """
+    Test the status UPDATE built by the repository; no database needed.
+    """
+
+    def test_additional_fields_whitelist(self):
+        """Test that only updatable lead columns make it into the UPDATE."""
+        stmt = _status_update(1, LeadStatus.CONFIRMED, {
+            "id": 99,
+            "created_at": datetime(2020, 1, 1),
+            "not_a_column": "x",
+            "confirmed_email": "john@example.com",
+            "call_attempts": 2
+        })
+        params = stmt.compile().params
+        
+        self.assertEqual(params["confirmed_email"], "john@example.com")
+        self.assertEqual(params["call_attempts"], 2)
+        for key in ("id", "created_at", "not_a_column"):
+            with self.subTest(key=key):
+                self.assertNotIn(key, params)
+        
+        # The lead to update is still picked by the WHERE clause
+        self.assertEqual(params["id_1"], 1)
+    
+    def test_no_additional_fields(self):
+        """Test that the status and its update time are always set."""
+        stmt = _status_update(1, LeadStatus.PENDING, None)
+        params = stmt.compile().params
+        
+        self.assertEqual(params["status"], LeadStatus.PENDING)
+        self.assertIsInstance(params["status_updated_at"], datetime)
+        self.assertEqual(params["id_1"], 1)
 
 
 class TestDatabase(unittest.TestCase):
@@ -24,70 +111,87 @@ class TestDatabase(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """Set up the test database."""
-        # Create a temporary in-memory SQLite database for testing
-        cls.engine = create_engine("sqlite:///:memory:")
+        # Create a temporary in-memory SQLite database for testing. Every connection
+        # to :memory: gets its own database, so StaticPool keeps a single one
+        cls.engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        
+        # Let SQLAlchemy issue BEGIN itself, so pysqlite honours SAVEPOINTs, and
+        # skip durability work the throwaway database doesn't need
+        @event.listens_for(cls.engine, "connect")
+        def configure_connection(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=MEMORY")
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.close()
+        
+        @event.listens_for(cls.engine, "begin")
+        def begin_transaction(connection):
+            connection.exec_driver_sql("BEGIN")
+        
         Base.metadata.create_all(cls.engine)
-        cls.SessionFactory = sessionmaker(bind=cls.engine)
+        
+        # Data for the lead each test starts with
+        cls.test_lead_data = {
+            "firstname": "Test",
+            "lastname": "User",
+            "email": "test@example.com",
+            "phone1": "1234567890",
+            "address": "123 Test St",
+            "city": "Test City",
+            "state": "TS",
+            "zip": "12345",
+            "status": LeadStatus.PENDING
+        }
+        
+        # One connection for the whole class; each test runs in a transaction on it
+        cls.connection = cls.engine.connect()
+        cls.SessionFactory = sessionmaker(bind=cls.connection, join_transaction_mode="create_savepoint")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Tear down the test database."""
+        cls.connection.close()
+        cls.engine.dispose()
 
     def setUp(self):
         """Set up each test."""
-        # Create a new session for each test
+        # Start the transaction rolled back after the test; session commits
+        # only release savepoints inside it
+        self.transaction = self.connection.begin()
         self.session = self.SessionFactory()
         
-        # Clean up any existing test data
-        self.session.query(Lead).filter_by(email="test@example.com").delete()
-        self.session.commit()
-        
         # Create a test lead
-        self.test_lead = Lead(
-            firstname="Test",
-            lastname="User",
-            email="test@example.com",
-            phone1="1234567890",
-            address="123 Test St",
-            city="Test City",
-            state="TS",
-            zip="12345",
-            status=LeadStatus.PENDING
-        )
+        self.test_lead = Lead(**self.test_lead_data)
         
-        # Add the test lead to the session
+        # Add the test lead to the session and flush to get the assigned ID
         self.session.add(self.test_lead)
-        self.session.commit()
-        # Refresh to get the assigned ID
-        self.session.refresh(self.test_lead)
+        self.session.flush()
 
     def tearDown(self):
         """Clean up after each test."""
-        # Delete any test leads
-        self.session.query(Lead).filter_by(email="test@example.com").delete()
-        self.session.commit()
-        
-        # Close the session
+        # Close the session and discard everything the test wrote
         self.session.close()
+        self.transaction.rollback()
 
     def test_lead_creation(self):
         """Test that a lead can be created."""
-        # Query the lead from the database
-        lead = self.session.query(Lead).filter_by(email="test@example.com").first()
-        
-        # Check that the lead exists and has the correct data
-        self.assertIsNotNone(lead)
-        self.assertEqual(lead.firstname, "Test")
-        self.assertEqual(lead.lastname, "User")
-        self.assertEqual(lead.status, LeadStatus.PENDING)
-
-    def test_lead_status_enum(self):
-        """Test the LeadStatus enum."""
-        # Check that all required statuses exist
-        self.assertEqual(LeadStatus.PENDING.value, "pending")
-        self.assertEqual(LeadStatus.CALLING.value, "calling")
-        self.assertEqual(LeadStatus.CONFIRMED.value, "confirmed")
-        self.assertEqual(LeadStatus.NOT_INTERESTED.value, "not_interested")
-        self.assertEqual(LeadStatus.CALL_FAILED.value, "call_failed")
-        self.assertEqual(LeadStatus.ENTRY_IN_PROGRESS.value, "entry_in_progress")
-        self.assertEqual(LeadStatus.ENTERED.value, "entered")
-        self.assertEqual(LeadStatus.ENTRY_FAILED.value, "entry_failed")
+        # Query the lead from the database; relationships must not be lazy loaded
+        with count_queries(self.engine) as queries:
+            lead = self.session.get(Lead, self.test_lead.id, options=[raiseload("*")])
+            
+            # Check that the lead exists and has the correct data
+            self.assertIsNotNone(lead)
+            self.assertEqual(lead.firstname, "Test")
+            self.assertEqual(lead.lastname, "User")
+            self.assertEqual(lead.status, LeadStatus.PENDING)
+        
+        self.assertLessEqual(len(queries), 1, queries)
 
     def test_update_lead_status(self):
         """Test updating a lead's status."""
@@ -102,8 +206,14 @@ class TestDatabase(unittest.TestCase):
         self.session.flush()
         self.session.refresh(self.test_lead)
         
-        # Query the lead from the database by ID to ensure we get the right one
-        lead = self.session.query(Lead).filter_by(id=test_lead_id).first()
+        # Load the lead from the database by ID to ensure we get the right one;
+        # expiring it makes get() read the row again
+        self.session.expire(self.test_lead)
+        with count_queries(self.engine) as queries:
+            lead = self.session.get(Lead, test_lead_id, options=[raiseload("*")])
+            status = lead.status if lead is not None else None
+        
+        self.assertLessEqual(len(queries), 1, queries)
         
         # Ensure we found a lead
         self.assertIsNotNone(lead, "Failed to retrieve the lead by ID")
@@ -113,7 +223,7 @@ class TestDatabase(unittest.TestCase):
         
         # Check that the status was updated - both on test_lead and queried lead
         self.assertEqual(self.test_lead.status, LeadStatus.CALLING)
-        self.assertEqual(lead.status, LeadStatus.CALLING)
+        self.assertEqual(status, LeadStatus.CALLING)
 
 
 class TestRepositoryIntegration(unittest.TestCase):
@@ -124,11 +234,14 @@ class TestRepositoryIntegration(unittest.TestCase):
     They should be run in a controlled environment, not in production.
     """
     
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """Set up the test database."""
-        # Initialize the database
+        # Initialize the database once for the class
         Base.metadata.create_all(engine)
-        
+    
+    def setUp(self):
+        """Set up each test."""
         # Create test lead
         self.test_lead_data = {
             "firstname": "Integration",
@@ -177,13 +290,11 @@ class TestRepositoryIntegration(unittest.TestCase):
         self.assertEqual(lead.lastname, "Test")
         self.assertEqual(lead.email, "integration@test.com")
         
-        # Clean up - make sure we use a session
+        # Clean up - get_db_session commits the delete on exit
         with get_db_session() as session:
-            # Find the lead again within this session
-            db_lead = session.query(Lead).filter(Lead.id == lead_id).first()
-            if db_lead:
+            db_lead = session.get(Lead, lead_id)
+            if db_lead is not None:
                 session.delete(db_lead)
-                session.commit()
 
 
 if __name__ == "__main__":
@@ -10,16 +10,27 @@ import sys
 import unittest
 import subprocess
 import time
-import requests
+import json
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from pathlib import Path
 import psycopg2
 
 # Add parent directory to path to allow imports
 sys.path.append(str(Path(__file__).parent.parent))
 
+# Starting the containers takes a while, so these tests only run when asked for
+if os.environ.get("RUN_DOCKER_TESTS") != "1":
+    raise unittest.SkipTest("Docker integration tests disabled; set RUN_DOCKER_TESTS=1")
+
+
 class TestDockerIntegration(unittest.TestCase):
     """Test that Docker integration is working properly."""
     
+    # Compose services the tests need
+    DOCKER_SERVICES = {"app", "db"}
+    
     @classmethod
     def setUpClass(cls):
         """Set up Docker containers for testing."""
@@ -36,105 +47,178 @@ class TestDockerIntegration(unittest.TestCase):
         # Check if docker-compose file exists
         if not cls.docker_compose_file.exists():
             raise unittest.SkipTest("docker-compose.yml not found")
+        
+        # Prefer the Compose V2 plugin, falling back to the standalone docker-compose
+        try:
+            subprocess.run(["docker", "compose", "version"], capture_output=True, check=True)
+            cls.compose_command = ["docker", "compose"]
+        except (subprocess.SubprocessError, FileNotFoundError):
+            cls.compose_command = ["docker-compose"]
             
-        # Start the containers
-        print("Starting Docker containers for testing...")
-        subprocess.check_call(
-            ["docker-compose", "-f", str(cls.docker_compose_file), "up", "-d"],
-            stdout=subprocess.DEVNULL
-        )
+        # Start the containers unless they are already running
+        cls.started_containers = not cls.DOCKER_SERVICES <= cls._running_services()
+        if cls.started_containers:
+            print("Starting Docker containers for testing...")
+            try:
+                cls._compose("up", "-d")
+            except subprocess.CalledProcessError as e:
+                raise unittest.SkipTest(f"docker compose up failed: {e.stderr.decode()[:500]}")
+        else:
+            print("Using Docker containers that are already running")
         
         # Wait for containers to be ready
         cls._wait_for_services()
+        
+        # One database connection shared by the tests; tests needing it fail
+        # on their own if it could not be opened
+        try:
+            cls.db_conn = psycopg2.connect(
+                host="localhost",
+                port=5432,
+                database="multiagent_db",
+                user="multiagent",
+                password=os.environ.get("DB_PASSWORD", "multiagent_password"),
+                connect_timeout=3
+            )
+        except psycopg2.Error as e:
+            print(f"Warning: could not connect to the database: {e}")
+            cls.db_conn = None
     
     @classmethod
     def tearDownClass(cls):
         """Tear down Docker containers after testing."""
+        if cls.db_conn is not None:
+            cls.db_conn.close()
+        
+        # Leave running containers up if they were there before or KEEP_DOCKER_UP=1
+        if not cls.started_containers or os.environ.get("KEEP_DOCKER_UP") == "1":
+            print("Leaving Docker containers running")
+            return
+        
         print("Stopping Docker containers...")
-        subprocess.check_call(
-            ["docker-compose", "-f", str(cls.docker_compose_file), "down"],
-            stdout=subprocess.DEVNULL
+        try:
+            cls._compose("down")
+        except subprocess.CalledProcessError as e:
+            print(f"Warning: docker compose down failed: {e.stderr.decode()[:500]}")
+            raise
+    
+    @classmethod
+    def _compose(cls, *args, stdout=subprocess.DEVNULL):
+        """Run a compose command against the project file, capturing stderr for errors."""
+        return subprocess.run(
+            [*cls.compose_command, "-f", str(cls.docker_compose_file), *args],
+            stdout=stdout,
+            stderr=subprocess.PIPE,
+            check=True
         )
     
     @classmethod
-    def _wait_for_services(cls, max_attempts=30, delay=2):
-        """Wait for services to be ready."""
+    def _running_services(cls):
+        """Return the names of the compose services that are running."""
+        try:
+            result = cls._compose("ps", "--services", "--filter", "status=running", stdout=subprocess.PIPE)
+        except (subprocess.SubprocessError, FileNotFoundError):
+            return set()
+        return set(result.stdout.decode().split())
+    
+    @classmethod
+    def _wait_for_services(cls, timeout=60, max_delay=2.0):
+        """Wait for services to be ready, probing with exponential backoff."""
         print("Waiting for services to be ready...")
         
         # Wait for API to be responsive
         api_ready = False
         db_ready = False
-        attempts = 0
+        delay = 0.1
+        deadline = time.monotonic() + timeout
         
-        while (not api_ready or not db_ready) and attempts < max_attempts:
-            attempts += 1
-            
-            # Check API
-            if not api_ready:
-                try:
-                    response = requests.get("http://localhost:8000/api/status", timeout=2)
-                    if response.status_code == 200:
-                        api_ready = True
-                        print("API is ready")
-                except requests.exceptions.RequestException:
-                    pass
-            
-            # Check Database
-            if not db_ready:
-                try:
-                    conn = psycopg2.connect(
-                        host="localhost",
-                        port=5432,
-                        database="multiagent_db",
-                        user="multiagent",
-                        password=os.environ.get("DB_PASSWORD", "multiagent_password"),
-                        connect_timeout=3
-                    )
-                    conn.close()
+        # One keep-alive HTTP connection for all API probes; the API and
+        # database are probed at the same time
+        probe = http.client.HTTPConnection("localhost", 8000, timeout=1)
+        with closing(probe), ThreadPoolExecutor(max_workers=2) as executor:
+            while (not api_ready or not db_ready) and time.monotonic() < deadline:
+                api_future = executor.submit(cls._api_responds, probe) if not api_ready else None
+                db_future = executor.submit(cls._database_responds) if not db_ready else None
+                
+                # Check API
+                if api_future is not None and api_future.result():
+                    api_ready = True
+                    print("API is ready")
+                
+                # Check Database
+                if db_future is not None and db_future.result():
                     db_ready = True
                     print("Database is ready")
-                except (psycopg2.OperationalError, psycopg2.Error):
-                    pass
+                
+                if not api_ready or not db_ready:
+                    time.sleep(delay)
+                    delay = min(delay * 2, max_delay)
             
-            if not api_ready or not db_ready:
-                time.sleep(delay)
-        
-        if not api_ready:
-            print("Warning: API did not become ready in time")
-        if not db_ready:
-            print("Warning: Database did not become ready in time")
+            if not api_ready:
+                print("Warning: API did not become ready in time")
+            if not db_ready:
+                print("Warning: Database did not become ready in time")
             
-        # Always provide some time for services to stabilize
-        time.sleep(2)
+            # Make sure the API stays up past its first response
+            if api_ready and not cls._api_responds(probe):
+                print("Warning: API stopped responding after becoming ready")
+    
+    @staticmethod
+    def _api_responds(probe):
+        """Return True if the API status endpoint answers with 200."""
+        try:
+            probe.request("GET", "/api/status")
+            response = probe.getresponse()
+            response.read()
+            return response.status == 200
+        except (OSError, http.client.HTTPException):
+            # Reconnect on the next probe
+            probe.close()
+            return False
+    
+    @staticmethod
+    def _database_responds():
+        """Return True if a database connection can be opened."""
+        try:
+            conn = psycopg2.connect(
+                host="localhost",
+                port=5432,
+                database="multiagent_db",
+                user="multiagent",
+                password=os.environ.get("DB_PASSWORD", "multiagent_password"),
+                connect_timeout=1
+            )
+            conn.close()
+            return True
+        except (psycopg2.OperationalError, psycopg2.Error):
+            return False
     
     def test_api_status_endpoint(self):
         """Test that the API status endpoint responds correctly."""
+        connection = http.client.HTTPConnection("localhost", 8000, timeout=10)
         try:
-            response = requests.get("http://localhost:8000/api/status")
-            self.assertEqual(response.status_code, 200)
-            data = response.json()
+            connection.request("GET", "/api/status")
+            response = connection.getresponse()
+            self.assertEqual(response.status, 200)
+            data = json.loads(response.read())
             self.assertIn("status", data)
             self.assertIn("system_status", data)
             self.assertIn("database_status", data)
-        except requests.exceptions.RequestException as e:
+        except (OSError, http.client.HTTPException) as e:
             self.fail(f"API request failed: {e}")
+        finally:
+            connection.close()
     
     def test_database_connection(self):
         """Test that we can connect to the database."""
+        if self.db_conn is None:
+            self.fail("Database connection failed")
+        
         try:
-            conn = psycopg2.connect(
-                host="localhost",
-                port=5432,
-                database="multiagent_db",
-                user="multiagent",
-                password=os.environ.get("DB_PASSWORD", "multiagent_password")
-            )
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            result = cursor.fetchone()
-            self.assertEqual(result[0], 1)
-            cursor.close()
-            conn.close()
+            with self.db_conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                result = cursor.fetchone()
+                self.assertEqual(result[0], 1)
         except (psycopg2.OperationalError, psycopg2.Error) as e:
             self.fail(f"Database connection failed: {e}")
 
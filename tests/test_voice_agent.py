@@ -0,0 +1,194 @@
+import sys
+import asyncio
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# Add the parent directory to the path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.agents import voice_agent
+from app.agents.voice_agent import AssistableAIClient, VoiceAgent, _parse_call_responses
+from app.database.models import LeadStatus
+
+
+class TestParseCallResponses(unittest.TestCase):
+    """
+    Test extracting confirmed lead information from call transcripts.
+    """
+
+    def test_empty_transcript(self):
+        """Test the defaults when the transcript has no responses."""
+        self.assertEqual(_parse_call_responses({}), {
+            "confirmed_email": None,
+            "confirmed_address": None,
+            "confirmed_area_of_interest": None,
+            "tcpa_accepted": False,
+            "interested": True
+        })
+
+    def test_full_transcript(self):
+        """Test a call where the lead confirms everything."""
+        result = _parse_call_responses({
+            "verify_identity": {"confirmed": True, "value": "john@example.com"},
+            "collect_address": {"value": "123 Main St"},
+            "verify_education": {"response": "yes"},
+            "area_of_interest": {"response": "yes", "value": "Nursing"},
+            "tcpa_compliance": {"response": "yes"}
+        })
+
+        self.assertEqual(result["confirmed_email"], "john@example.com")
+        self.assertEqual(result["confirmed_address"], "123 Main St")
+        self.assertEqual(result["confirmed_area_of_interest"], "Nursing")
+        self.assertTrue(result["tcpa_accepted"])
+        self.assertTrue(result["interested"])
+
+    def test_unconfirmed_identity(self):
+        """Test that an unconfirmed email is not taken over."""
+        result = _parse_call_responses({
+            "verify_identity": {"confirmed": False, "value": "wrong@example.com"}
+        })
+
+        self.assertIsNone(result["confirmed_email"])
+
+    def test_tcpa_declined(self):
+        """Test that TCPA consent needs an explicit yes."""
+        for response in ("no", "maybe", None):
+            with self.subTest(response=response):
+                result = _parse_call_responses({"tcpa_compliance": {"response": response}})
+                self.assertFalse(result["tcpa_accepted"])
+
+    def test_not_interested(self):
+        """Test that declining education or the area of interest marks the lead not interested."""
+        for section in ("verify_education", "area_of_interest"):
+            with self.subTest(section=section):
+                result = _parse_call_responses({section: {"response": "no"}})
+                self.assertFalse(result["interested"])
+
+    def test_unknown_sections_ignored(self):
+        """Test that sections without a handler are skipped."""
+        result = _parse_call_responses({
+            "greeting": {"response": "no"},
+            "end_call": {"value": "bye"}
+        })
+
+        self.assertTrue(result["interested"])
+        self.assertIsNone(result["confirmed_email"])
+
+
+class TestGetCallStatuses(unittest.IsolatedAsyncioTestCase):
+    """
+    Test the bulk call status check and its per-call fallback.
+    """
+
+    async def asyncSetUp(self):
+        """Set up the test."""
+        self.client = AssistableAIClient(api_key="test-key", api_url="http://assistable.test")
+        self.client.get_call_status = mock.AsyncMock(
+            side_effect=lambda call_id: {"success": True, "status": "completed", "details": {"status": "completed"}}
+        )
+
+    async def asyncTearDown(self):
+        """Clean up after the test."""
+        await self.client.aclose()
+
+    async def test_bulk_response_used(self):
+        """Test that calls in the bulk response are not checked again."""
+        self.client._get_call_statuses_bulk = mock.AsyncMock(return_value={
+            "success": True,
+            "calls": [{"call_id": "a", "status": "in-progress"}, {"call_id": "b", "status": "completed"}]
+        })
+
+        result = await self.client.get_call_statuses(["a", "b"])
+
+        self.assertEqual({call["call_id"]: call["status"] for call in result["calls"]}, {"a": "in-progress", "b": "completed"})
+        self.client.get_call_status.assert_not_awaited()
+
+    async def test_missing_calls_checked_individually(self):
+        """Test that calls left out of the bulk response are checked one by one."""
+        self.client._get_call_statuses_bulk = mock.AsyncMock(return_value={
+            "success": True,
+            "calls": [{"call_id": "a", "status": "in-progress"}]
+        })
+
+        result = await self.client.get_call_statuses(["a", "b"])
+
+        self.assertEqual({call["call_id"] for call in result["calls"]}, {"a", "b"})
+        self.client.get_call_status.assert_awaited_once_with("b")
+
+    async def test_bulk_failure_falls_back(self):
+        """Test that a failed bulk request falls back to per-call checks, and a 404 disables it."""
+        self.client._get_call_statuses_bulk = mock.AsyncMock(return_value={
+            "success": False, "error": "Not Found", "status_code": 404
+        })
+
+        result = await self.client.get_call_statuses(["a", "b"])
+        await self.client.get_call_statuses(["c"])
+
+        self.assertEqual({call["call_id"] for call in result["calls"]}, {"a", "b"})
+        self.client._get_call_statuses_bulk.assert_awaited_once()
+        self.assertEqual(self.client.get_call_status.await_count, 3)
+
+
+class TestDuplicatePhoneNumbers(unittest.IsolatedAsyncioTestCase):
+    """
+    Test that a number with a call in progress is not called again.
+    """
+
+    async def asyncSetUp(self):
+        """Set up the test."""
+        with mock.patch.object(voice_agent, "ASSISTABLE_API_KEY", "test-key"):
+            self.agent = VoiceAgent()
+
+        async def make_call(phone_number, lead_data):
+            await asyncio.sleep(0.01)  # Keep the first call in flight
+            return {"success": False, "error": "Busy"}
+
+        self.agent.assistable_client.make_call = mock.AsyncMock(side_effect=make_call)
+        repository_patcher = mock.patch.object(voice_agent, "LeadRepository")
+        self.repository = repository_patcher.start()
+        self.addCleanup(repository_patcher.stop)
+
+    async def asyncTearDown(self):
+        """Clean up after the test."""
+        await self.agent.assistable_client.aclose()
+
+    def make_lead(self, lead_id: int, phone1: str) -> SimpleNamespace:
+        """Build a stand-in for a claimed lead."""
+        return SimpleNamespace(
+            id=lead_id, firstname="John", lastname="Doe", email=None, phone1=phone1,
+            address=None, address2=None, city=None, state=None, zip=None,
+            education_level=None, area_of_study=None, call_initiated_at=None
+        )
+
+    async def test_same_number_called_once(self):
+        """Test that two leads with the same phone1 produce one call."""
+        await asyncio.gather(
+            self.agent.process_lead(self.make_lead(1, "5551234567")),
+            self.agent.process_lead(self.make_lead(2, "5551234567"))
+        )
+
+        self.agent.assistable_client.make_call.assert_awaited_once()
+
+        # The duplicate is closed out rather than left claimed
+        duplicate = [call.args for call in self.repository.finalize_call.call_args_list if call.args[0] == 2]
+        self.assertEqual(len(duplicate), 1)
+        self.assertEqual(duplicate[0][1], LeadStatus.CALL_FAILED)
+        self.assertEqual(duplicate[0][3]["status"], "duplicate")
+        self.assertEqual(self.agent._inflight_phones, set())
+
+    async def test_different_numbers_called(self):
+        """Test that leads without a phone number, or with different ones, are all called."""
+        await asyncio.gather(
+            self.agent.process_lead(self.make_lead(1, "5551234567")),
+            self.agent.process_lead(self.make_lead(2, "5559876543")),
+            self.agent.process_lead(self.make_lead(3, None)),
+            self.agent.process_lead(self.make_lead(4, None))
+        )
+
+        self.assertEqual(self.agent.assistable_client.make_call.await_count, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()